@@ -1,7 +1,12 @@
 import os
 import json
+import asyncio
+from concurrent.futures import ThreadPoolExecutor
 import gspread
+from requests.adapters import HTTPAdapter
+from gspread.utils import fill_gaps, rowcol_to_a1
 import re
+import html
 import logging
 import time
 from oauth2client.service_account import ServiceAccountCredentials
@@ -15,10 +20,26 @@ from telegram.ext import (
     ContextTypes, 
     ConversationHandler,
     JobQueue,
+    AIORateLimiter,
+    PicklePersistence,
 ) 
-from datetime import datetime, timedelta
-import pytz
+from datetime import date, datetime, timedelta
+from collections import ChainMap, OrderedDict
+from itertools import groupby, islice
+from operator import itemgetter
+from zoneinfo import ZoneInfo
 import random
+from dataclasses import astuple, dataclass
+from functools import lru_cache, wraps
+
+try:
+    from itertools import batched
+except ImportError:  # Python < 3.12
+    def batched(iterable, n):
+        """Разбить итерируемое на кортежи по n элементов (последний может быть короче)"""
+        it = iter(iterable)
+        while chunk := tuple(islice(it, n)):
+            yield chunk
 
 # ==================== НАСТРОЙКА ЛОГИРОВАНИЯ ====================
 logging.basicConfig(
@@ -29,11 +50,30 @@ logger = logging.getLogger(__name__)
 
 # ==================== КОНСТАНТЫ ====================
 SCOPE = ["https://spreadsheets.google.com/feeds", "https://www.googleapis.com/auth/drive"]
-MOSCOW_TZ = pytz.timezone('Europe/Moscow')
+MOSCOW_TZ = ZoneInfo('Europe/Moscow')
 REMINDER_TIME = "09:00"
-REMINDER_CHECK_INTERVAL = 60
+_REMINDER_TIME_OBJ = datetime.strptime(REMINDER_TIME, "%H:%M").time()
+REMINDER_DAYS_AHEAD = 10  # За сколько дней до задания начинаются напоминания
+REMINDER_REFRESH_LEAD = timedelta(minutes=5)  # За сколько до рассылки пересобирать напоминания
 MAX_RETRIES = 3
 RETRY_DELAY = 5
+RETRY_MAX_DELAY = 60  # Потолок экспоненциальной паузы между повторами (сек)
+GSH_MAX_WORKERS = 8  # Потоков для блокирующих вызовов gspread
+GSH_POOL_MAXSIZE = 16  # Keep-alive соединений к Google API на один хост
+TG_CONNECTION_POOL_SIZE = 256  # Соединений к Telegram Bot API (по числу одновременных обновлений)
+TG_HTTP_VERSION = "2"  # HTTP/2 мультиплексирует запросы к Bot API в меньшем числе соединений
+TG_POOL_TIMEOUT = 30  # Ожидание свободного соединения из пула (сек)
+CONCURRENT_UPDATES = 256  # Максимум одновременно обрабатываемых обновлений
+STATS_MAX_GROUPS = 30  # Групп в статистике (сообщение Telegram ограничено 4096 символами)
+BROADCAST_CONCURRENCY = 25  # Одновременных отправок при рассылке (ниже лимита Telegram 30 msg/s)
+TG_RATE_LIMIT_RETRIES = 3  # Повторов запроса после 429 (пауза — retry_after из ответа Telegram)
+PERSISTENCE_FILE = "bot_state.pkl"  # Файл состояния диалогов и списка прогреваемых листов
+ALLOWED_UPDATES = [Update.MESSAGE, Update.CALLBACK_QUERY]  # Бот обрабатывает только сообщения и кнопки
+WRITE_DEBOUNCE_DELAY = 0.1  # Окно (сек) для объединения записей в один лист
+SHEET_CACHE_TTL = 3600  # Страховочный TTL кэша; основная инвалидация — при записи
+SHEET_CACHE_TTL_JITTER = 0.2  # Разброс TTL (±20%), чтобы записи не истекали одновременно
+MAX_SHEET_CACHE_ENTRIES = 64  # Максимум листов в кэше (вытесняются давно не читанные)
+SHEET_CACHE_EVICT_WINDOW = 0.1  # Доля самых давних записей, среди которых выбирается вытесняемая
 
 # Прокси для обхода блокировок Telegram в РФ
 PROXY_URL = "http://138.68.161.14:3128"  # Публичный прокси сервер
@@ -49,13 +89,336 @@ LANGUAGES = {"ru": "Русский", "en": "English"}
 ALLOWED_GROUPS = []
 
 # Суперадмины (только твой user_id)
-SUPER_ADMINS = [1062616885]  # Замени на свой user_id
+SUPER_ADMINS = frozenset({1062616885})  # Замени на свой user_id
+
+# Скомпилированные шаблоны callback_data для обработчиков (точное совпадение)
+CALLBACK_PATTERNS = {
+    name: re.compile(rf"^{name}$")
+    for name in (
+        "get_data", "help", "back_to_menu", "select_group", "admin_panel", "reminder_settings",
+        "toggle_reminders", "language_settings", "admin_make_curator", "admin_list_curators",
+        "admin_stats", "admin_new_semester", "confirm_new_semester", "add_task", "delete_task",
+        "leave_feedback", "cancel_feedback",
+    )
+}
+CALLBACK_PATTERNS["set_group"] = re.compile(r"^set_group_B-11$|^set_group_B-12$")
+CALLBACK_PATTERNS["set_lang"] = re.compile(r"^set_lang_ru$|^set_lang_en$")
+
+# Общий фильтр текстовых сообщений без команд
+TEXT_NO_COMMAND = filters.TEXT & ~filters.COMMAND
+
+# Шаблон callback_data для кнопок дат (ДД.ММ)
+_DATE_CB_RE = re.compile(r"\A\d\d\.\d\d\Z")
+# Дата, введенная вручную (ДД.ММ с допустимыми днем и месяцем)
+_DATE_INPUT_RE = re.compile(r"\A(0[1-9]|[12]\d|3[01])\.(0[1-9]|1[0-2])\Z")
+# Название группы куратора: Буква-Цифры (B-13, A-105)
+_GROUP_NAME_RE = re.compile(r"\A[A-Z]-\d{2,3}\Z")
+# callback_data кнопки удаления задания: delete_<лист>_<номер строки>
+_DELETE_CB_RE = re.compile(r"\Adelete_(.+)_(\d+)\Z")
+# callback_data кнопки удаления прошедших заданий: prune_<лист>
+_PRUNE_CB_RE = re.compile(r"\Aprune_(.+)\Z")
+
+# Числовые части названий для естественной сортировки (B-99 раньше B-105)
+_DIGITS_RE = re.compile(r"(\d+)")
+
+
+# Значения времени "по расписанию" (дедлайн — конец дня)
+_SCHEDULE_MARKERS = frozenset({"By schedule", "По расписанию"})
+
+# Написания логического TRUE в таблице (проверка без .lower() на каждую строку)
+_TRUE_VALUES = frozenset({"true", "TRUE", "True"})
+
+# Номера столбцов (с 1) полей пользователя на листе Users
+_USER_COLS = {
+    "group": 2,
+    "reminders_enabled": 3,
+    "language": 4,
+    "feedback": 5,
+    "is_curator": 6,
+}
+
+# Предметы и типы заданий из клавиатур редактирования
+_SUBJECTS = frozenset({"Entrepreneurship", "Financial Analysis", "International Economics",
+                       "Law", "Marketing", "Statistics"})
+_TASK_TYPES = frozenset({"Test", "HW", "MidTerm", "FinalTest"})
+
+# Значения поля "Детали", которые означают, что детали не указаны
+_UNSET_DETAILS = frozenset({"", "не выбраны", "not selected"})
+
+@dataclass(slots=True)
+class TaskDraft:
+    """Черновик задания в редакторе куратора
+    
+    Поля идут в порядке столбцов листа группы; невыбранное поле хранится как None.
+    """
+    subject: str | None = None
+    task_type: str | None = None
+    format: str | None = None
+    max_points: str | None = None
+    date: str | None = None
+    time: str | None = None
+    group: str | None = None
+    book_type: str | None = None
+    details: str | None = None
+
+# Обязательные поля задания (невыбранное поле хранится как None)
+_REQUIRED_KEYS = ("subject", "task_type", "max_points", "date", "time", "format", "book_type")
+
+# Шаблоны строки задания в ежедневном напоминании (parse_mode='HTML', поля экранируются)
+_RU_TASK_FMT = (
+    "{book_icon} <b>{subject}</b> — {task_type} | {format}\n"
+    "📅 {date} | 🕒 {time} | <b>{max_points}</b> баллов курса\n"
+    "{details}"
+)
+_EN_TASK_FMT = (
+    "{book_icon} <b>{subject}</b> — {task_type} ({format})\n"
+    "📅 {date} | 🕒 {time} | <b>{max_points}</b> course points\n"
+    "{details}"
+)
+# Поля задания из листа, которые подставляются в шаблон строки напоминания
+_REMINDER_TEXT_FIELDS = ("subject", "task_type", "format", "date", "time", "max_points")
+
+# Постоянные тексты сообщений на обоих языках: {язык: {ключ: текст}}
+MESSAGES = {
+    "ru": {
+        "welcome": (
+            "👋 Привет! Добро пожаловать в *GSOMPASS бот*.\n\n"
+            "Выберите действие ниже:"
+        ),
+        "back_to_menu": "👋 Вы вернулись в главное меню. Выберите действие:",
+        "help": (
+            "📌 Возможности бота:\n\n"
+            "• 📋 Посмотреть задания своей группы\n"
+            "• ➕ Добавить задание (для кураторов)\n"
+            "• 🗑️ Удалить задание (для кураторов)\n"
+            "• 🗓️ Данные берутся из Google Таблицы\n"
+            "• 🔔 Напоминания о заданиями\n"
+            "• 👥 Выбор/изменение группы\n"
+            "• 📝 Отправить отзыв разработчику\n"
+            "• 🔒 Доступ к изменению только у кураторов"
+        ),
+        "admin_panel": (
+            "👑 *АДМИН-ПАНЕЛЬ*\n\n"
+            "Выберите действие:"
+        ),
+        "make_curator": (
+            "👥 *Назначение куратора*\n\n"
+            "Введите user_id пользователя (только цифры):\n\n"
+            "Как получить user_id:\n"
+            "1. Попросите пользователя написать /start боту\n"
+            "2. Скопируйте цифры из его профиля Telegram\n"
+            "3. Отправьте мне эти цифры"
+        ),
+        "curators_list": "📋 *СПИСОК КУРАТОРОВ:*\n\n",
+        "feedback_prompt": "📝 Пожалуйста, напишите ваш отзыв или предложение по улучшению бота:",
+        "feedback_cancel_button": "↩️ Отменить",
+        "feedback_saved": "✅ Спасибо за ваш отзыв! Мы учтем ваши пожелания.",
+        "feedback_failed": "⛔ Не удалось сохранить отзыв. Попробуйте позже.",
+        "feedback_error": "⛔ Произошла ошибка при сохранении отзыва.",
+        "feedback_canceled": "🚫 Отправка отзыва отменена.",
+        # Шаблоны: подставляются через .format()
+        "tasks_header": "📌 Задания для группы {group}:\n\n",
+        "group_set": "✅ Ваша группа установлена: {group}",
+        # Время напоминаний — константа, текст форматируется один раз при загрузке
+        "reminder_settings": (
+            "🔔 Настройки напоминаний:\n\n"
+            f"Напоминания приходят каждый день в {REMINDER_TIME} по МСК за:\n"
+            "10, 9, 8, ..., 1 день и в день задания."
+        ),
+        "reminder_header": "🔔 <b>ЕЖЕДНЕВНОЕ НАПОМИНАНИЕ</b>\n\n",
+        "reminder_today": "\n<b>СЕГОДНЯ</b>\n",
+        "reminder_tomorrow": "\n<b>ЗАВТРА</b>\n",
+        "reminder_in_days": "\n<b>ЧЕРЕЗ {days} ДНЕЙ</b>\n",
+        "reminders_on": "✅ Напоминания включены!",
+        "reminders_off": "✅ Напоминания выключены!",
+        "language_changed": "✅ Язык изменен на русский!",
+        "new_semester_confirm": (
+            "🎓 *НОВЫЙ СЕМЕСТР*\n\n"
+            "Это действие:\n"
+            "• Архивирует все текущие листы групп\n"
+            "• Сбросит группы у всех кураторов\n"
+            "• Попросит кураторов ввести новые названия групп\n"
+            "• Создаст новые чистые листы\n\n"
+            "Продолжить?"
+        ),
+        "new_semester_notice": (
+            "🎓 *НОВЫЙ СЕМЕСТР!*\n\n"
+            "Данные прошлого семестра архивированы.\n"
+            "Пожалуйста, введите новое название вашей группы:\n"
+            "• Например: B-23, M-22, A-24\n"
+            "• Формат: Буква-Цифры (B-13)\n\n"
+            "Просто введите название группы в чат:"
+        ),
+        # Подсказки редактирования задания: ключ совпадает с callback_data кнопки
+        "edit_subject": "✍️ Выберите предмет:",
+        "edit_task_type": "📘 Выберите тип задания:",
+        "edit_max_points": "💯 Выберите количество баллов от курса:",
+        "edit_date": "🗓️ Выберите дату:",
+        "edit_time": "⏰ Выберите время:",
+        "edit_format": "📍 Выберите формат:",
+        "edit_details": "📝 Выберите детали:",
+        "other_subject": "✍️ Введите название предмета:",
+        "other_task_type": "📘 Введите тип задания:",
+        "other_max_points": "💯 Введите количество баллов:",
+        "custom_date": "🗓️ Введите дату в формате ДД.ММ (например, 15.12):",
+        "other_details": "📝 Введите детали:",
+        # Карточка редактируемого задания (HTML); поля подставляются через .format_map()
+        "task_editing": (
+            "📝 Редактирование задания:\n\n"
+            "🔹 <b>Предмет:</b> {subject}\n"
+            "🔹 <b>Тип задания:</b> {task_type}\n"
+            "🔹 <b>Макс. баллы:</b> {max_points}\n"
+            "🔹 <b>Дата:</b> {date}\n"
+            "🔹 <b>Время:</b> {time}\n"
+            "🔹 <b>Формат:</b> {format}\n"
+            "🔹 <b>Тип книги:</b> {book_type}\n"
+            "🔹 <b>Детали:</b> {details}\n\n"
+            "Выберите параметр для изменения или сохраните задание:"
+        ),
+        # Подписи невыбранных полей задания
+        "task_unset": {
+            "subject": "не выбрано",
+            "task_type": "не выбрано",
+            "max_points": "не выбрано",
+            "date": "не выбрана",
+            "time": "не выбрано",
+            "format": "не выбран",
+            "book_type": "не выбран",
+            "details": "не выбраны",
+        },
+        "by_schedule": "По расписанию",
+        "task_fill_required": "⚠️ Заполните все обязательные поля перед сохранением!",
+        "task_added": "✅ Задание успешно добавлено!",
+        "task_canceled": "🚫 Добавление задания отменено.",
+    },
+    "en": {
+        "welcome": (
+            "👋 Hi! Welcome to *GSOMPASS bot*.\n\n"
+            "Choose an action below:"
+        ),
+        "back_to_menu": "👋 You're back to the main menu. Choose an action:",
+        "help": (
+            "📌 Bot features:\n\n"
+            "• 📋 View tasks for your group\n"
+            "• ➕ Add task (for curators)\n"
+            "• 🗑️ Delete task (for curators)\n"
+            "• 🗓️ Data is taken from Google Sheets\n"
+            "• 🔔 Task reminders\n"
+            "• 👥 Select/change group\n"
+            "• 📝 Send feedback to developer\n"
+            "• 🔒 Only curators can make changes"
+        ),
+        "admin_panel": (
+            "👑 *ADMIN PANEL*\n\n"
+            "Choose an action:"
+        ),
+        "make_curator": (
+            "👥 *Make Curator*\n\n"
+            "Enter user_id (numbers only):\n\n"
+            "How to get user_id:\n"
+            "1. Ask user to type /start to the bot\n"
+            "2. Copy numbers from their Telegram profile\n"
+            "3. Send me these numbers"
+        ),
+        "curators_list": "📋 *CURATORS LIST:*\n\n",
+        "feedback_prompt": "📝 Please write your feedback or suggestion for improving the bot:",
+        "feedback_cancel_button": "↩️ Cancel",
+        "feedback_saved": "✅ Thank you for your feedback! We'll take it into account.",
+        "feedback_failed": "⛔ Failed to save feedback. Please try again later.",
+        "feedback_error": "⛔ An error occurred while saving feedback.",
+        "feedback_canceled": "🚫 Feedback submission canceled.",
+        "tasks_header": "📌 Tasks for group {group}:\n\n",
+        "group_set": "✅ Your group is set: {group}",
+        "reminder_settings": (
+            "🔔 Reminder settings:\n\n"
+            f"Reminders are sent daily at {REMINDER_TIME} MSK for:\n"
+            "10, 9, 8, ..., 1 days before and on the task day."
+        ),
+        "reminder_header": "🔔 <b>DAILY TASKS REMINDER</b>\n\n",
+        "reminder_today": "\n<b>TODAY</b>\n",
+        "reminder_tomorrow": "\n<b>TOMORROW</b>\n",
+        "reminder_in_days": "\n<b>IN {days} DAYS</b>\n",
+        "reminders_on": "✅ Reminders enabled!",
+        "reminders_off": "✅ Reminders disabled!",
+        "language_changed": "✅ Language changed to English!",
+        "new_semester_confirm": (
+            "🎓 *NEW SEMESTER*\n\n"
+            "This action will:\n"
+            "• Archive all current group sheets\n"
+            "• Reset groups for all curators\n"
+            "• Ask curators to enter new group names\n"
+            "• Create new clean sheets\n\n"
+            "Continue?"
+        ),
+        "new_semester_notice": (
+            "🎓 *NEW SEMESTER!*\n\n"
+            "Last semester's data has been archived.\n"
+            "Please enter the new name of your group:\n"
+            "• For example: B-23, M-22, A-24\n"
+            "• Format: Letter-Digits (B-13)\n\n"
+            "Just type the group name in the chat:"
+        ),
+        "edit_subject": "✍️ Select subject:",
+        "edit_task_type": "📘 Select task type:",
+        "edit_max_points": "💯 Select course points:",
+        "edit_date": "🗓️ Select date:",
+        "edit_time": "⏰ Select time:",
+        "edit_format": "📍 Select format:",
+        "edit_details": "📝 Select details:",
+        "other_subject": "✍️ Enter subject name:",
+        "other_task_type": "📘 Enter task type:",
+        "other_max_points": "💯 Enter points:",
+        "custom_date": "🗓️ Enter date in DD.MM format (e.g., 15.12):",
+        "other_details": "📝 Enter details:",
+        "task_editing": (
+            "📝 Editing task:\n\n"
+            "🔹 <b>Предмет:</b> {subject}\n"
+            "🔹 <b>Тип задания:</b> {task_type}\n"
+            "🔹 <b>Макс. баллы:</b> {max_points}\n"
+            "🔹 <b>Дата:</b> {date}\n"
+            "🔹 <b>Время:</b> {time}\n"
+            "🔹 <b>Формат:</b> {format}\n"
+            "🔹 <b>Тип книги:</b> {book_type}\n"
+            "🔹 <b>Детали:</b> {details}\n\n"
+            "Select a parameter to change or save the task:"
+        ),
+        "task_unset": dict.fromkeys(
+            ("subject", "task_type", "max_points", "date", "time", "format", "book_type", "details"),
+            "not selected"
+        ),
+        "by_schedule": "By schedule",
+        "task_fill_required": "⚠️ Fill all required fields before saving!",
+        "task_added": "✅ Task added successfully!",
+        "task_canceled": "🚫 Task addition canceled.",
+    },
+}
+
+# Заголовки дней в напоминании по days_left: {язык: (сегодня, завтра, через 2 дня, ...)}
+_REMINDER_DAY_HEADERS = {
+    lang: (
+        texts["reminder_today"],
+        texts["reminder_tomorrow"],
+        *(texts["reminder_in_days"].format(days=days) for days in range(2, REMINDER_DAYS_AHEAD + 1)),
+    )
+    for lang, texts in MESSAGES.items()
+}
 
 # ==================== КЛАСС ДЛЯ РАБОТЫ С GOOGLE SHEETS ====================
+def _natural_sort_key(name):
+    """Ключ естественной сортировки: числа в названии сравниваются как числа"""
+    return [int(part) if part.isdigit() else part for part in _DIGITS_RE.split(name)]
+
+# Отдельный пул потоков для блокирующих запросов к Google Sheets
+GSH_EXECUTOR = ThreadPoolExecutor(max_workers=GSH_MAX_WORKERS, thread_name_prefix="gsheets")
+
 class GoogleSheetsHelper:
     def __init__(self):
         self.client = None
+        self.spreadsheet = None
         self.sheets = {}
+        self.group_sheets = set()  # Активные листы групп (без Users и архивов)
+        self._sorted_group_sheets = None  # Отсортированный кортеж group_sheets, строится по требованию
+        self._structure_lock = asyncio.Lock()  # Создание/архивация листов — по одной за раз
         self.initialize()
 
     def initialize(self):
@@ -65,65 +428,147 @@ class GoogleSheetsHelper:
 
         creds = ServiceAccountCredentials.from_json_keyfile_dict(json.loads(creds_json), SCOPE)
         self.client = gspread.authorize(creds)
+        # Одна сессия с пулом keep-alive соединений на все листы: потоки GSH_EXECUTOR
+        # переиспользуют TLS-соединения вместо нового рукопожатия на каждый запрос.
+        # Повторы при 429 выполняет сам хелпер, поэтому у адаптера они отключены.
+        adapter = HTTPAdapter(pool_connections=GSH_MAX_WORKERS, pool_maxsize=GSH_POOL_MAXSIZE, max_retries=0)
+        self.client.session.mount("https://", adapter)
         self.load_sheets()
 
     def load_sheets(self):
         try:
             spreadsheet = self.client.open("GSOM-PLANNER")
             worksheets = spreadsheet.worksheets()
-            self.sheets = {ws.title: ws for ws in worksheets}
+            self.spreadsheet = spreadsheet
+            self._set_worksheets(worksheets)
         except Exception as e:
-            logger.error(f"Error loading sheets: {e}")
+            logger.error("Error loading sheets: %s", e)
             raise
 
-    def get_sheet_data(self, sheet_name):
-        """Получить данные листа БЕЗ кэширования"""
+    def _set_worksheets(self, worksheets):
+        """Обновить словарь листов и множество листов групп по списку листов таблицы"""
+        self.sheets = {ws.title: ws for ws in worksheets}
+        self.group_sheets = {title for title in self.sheets if self._is_group_sheet(title)}
+        self._sorted_group_sheets = None
+
+    def sorted_group_sheets(self):
+        """Активные листы групп в естественном порядке (пересортировка только после изменений)"""
+        if self._sorted_group_sheets is None:
+            self._sorted_group_sheets = tuple(sorted(self.group_sheets, key=_natural_sort_key))
+        return self._sorted_group_sheets
+
+    @staticmethod
+    def _is_group_sheet(title):
+        """Лист активной группы: не служебный Users и не архив семестра"""
+        return title != "Users" and "_Archive_" not in title
+
+    @staticmethod
+    def _retry_delay(retries, error):
+        """Пауза перед повтором после 429: Retry-After или экспонента с джиттером"""
+        response = getattr(error, "response", None)
+        retry_after = response.headers.get("Retry-After") if response is not None else None
+        if retry_after and retry_after.isdigit():
+            return float(retry_after)
+        return min(RETRY_MAX_DELAY, RETRY_DELAY * 2 ** (retries - 1)) + random.uniform(0, RETRY_DELAY)
+
+    async def _acall(self, description, func, *args):
+        """Выполнить блокирующий вызов gspread в пуле потоков, повторяя при 429 без блокировки event loop"""
+        loop = asyncio.get_running_loop()
         retries = 0
         while retries < MAX_RETRIES:
             try:
-                if sheet_name not in self.sheets:
-                    return []
-                sheet = self.sheets[sheet_name]
-                data = sheet.get_all_values()
-                return data
+                return await loop.run_in_executor(GSH_EXECUTOR, func, *args)
             except gspread.exceptions.APIError as e:
                 if "429" in str(e):
                     retries += 1
-                    logger.warning(f"Rate limit exceeded (429), retry {retries}/{MAX_RETRIES}")
-                    time.sleep(RETRY_DELAY * retries)
+                    logger.warning("Rate limit exceeded (429), retry %s/%s", retries, MAX_RETRIES)
+                    await asyncio.sleep(self._retry_delay(retries, e))
                 else:
-                    logger.error(f"Error accessing Google Sheet {sheet_name}: {e}")
+                    logger.error("Error %s: %s", description, e)
                     raise
             except Exception as e:
-                logger.error(f"Unexpected error with sheet {sheet_name}: {e}")
+                logger.error("Unexpected error %s: %s", description, e)
                 raise
 
         raise Exception("Max retries exceeded for Google Sheets API")
 
-    def update_sheet(self, sheet_name, data):
-        """Обновить данные в листе"""
-        retries = 0
-        while retries < MAX_RETRIES:
-            try:
-                sheet = self.sheets[sheet_name]
-                if isinstance(data, list) and isinstance(data[0], list):
-                    sheet.append_row(data[0] if len(data) == 1 else data)
-                else:
-                    sheet.append_row(data)
-                return True
-            except gspread.exceptions.APIError as e:
-                if "429" in str(e):
-                    retries += 1
-                    logger.warning(f"Rate limit exceeded (429), retry {retries}/{MAX_RETRIES}")
-                    time.sleep(RETRY_DELAY * retries)
-                else:
-                    logger.error(f"Error updating Google Sheet {sheet_name}: {e}")
-                    raise
-            except Exception as e:
-                logger.error(f"Unexpected error updating sheet {sheet_name}: {e}")
-                raise
+    async def aget_sheet_data(self, sheet_name):
+        """Получить данные листа без кэширования (запрос идет в пуле потоков)"""
+        if sheet_name not in self.sheets:
+            return []
+        return await self._acall(f"accessing Google Sheet {sheet_name}", self.sheets[sheet_name].get_all_values)
+
+    def _append_values(self, sheet_name, rows):
+        """Добавить строки в конец листа одним запросом values.append"""
+        range_name = "'{}'".format(sheet_name.replace("'", "''"))
+        self.spreadsheet.values_append(
+            range_name,
+            {"valueInputOption": "RAW", "insertDataOption": "INSERT_ROWS"},
+            {"values": rows},
+        )
 
-        raise Exception("Max retries exceeded for Google Sheets API")
+    async def aupdate_sheet(self, sheet_name, data):
+        """Добавить в лист строку или список строк одним запросом values.append"""
+        if sheet_name not in self.sheets:
+            raise KeyError(sheet_name)
+        rows = data if data and isinstance(data[0], list) else [data]
+        await self._acall(f"updating Google Sheet {sheet_name}", self._append_values, sheet_name, rows)
+        return True
+
+    async def adelete_rows(self, sheet_name, start_index, end_index=None):
+        """Асинхронно удалить строки листа"""
+        await self._acall(f"deleting rows in Google Sheet {sheet_name}",
+                          self.sheets[sheet_name].delete_rows, start_index, end_index)
+
+    def _delete_row_indices(self, sheet_name, row_indices):
+        """Удалить несмежные строки листа одним batchUpdate (номера строк с 1)"""
+        sheet_id = self.sheets[sheet_name].id
+        # Снизу вверх, чтобы удаление не сдвигало номера еще не удаленных строк
+        self.spreadsheet.batch_update({"requests": [
+            {"deleteDimension": {"range": {
+                "sheetId": sheet_id, "dimension": "ROWS", "startIndex": row - 1, "endIndex": row,
+            }}}
+            for row in sorted(set(row_indices), reverse=True)
+        ]})
+
+    async def adelete_row_indices(self, sheet_name, row_indices):
+        """Асинхронно удалить несколько строк листа за один запрос"""
+        if not row_indices:
+            return
+        await self._acall(f"deleting rows in Google Sheet {sheet_name}",
+                          self._delete_row_indices, sheet_name, row_indices)
+
+    def batch_get_sheet_data(self, sheet_names):
+        """Получить данные нескольких листов одним запросом values.batchGet
+        
+        Одна попытка: повторы при 429 выполняет _acall, не занимая поток пула на паузу.
+        """
+        names = [name for name in sheet_names if name in self.sheets]
+        if not names:
+            return {}
+        ranges = ["'{}'".format(name.replace("'", "''")) for name in names]
+        response = self.spreadsheet.values_batch_get(ranges)
+        value_ranges = response.get("valueRanges", [])
+        # Выравниваем строки так же, как get_all_values
+        return {name: fill_gaps(vr.get("values", [])) for name, vr in zip(names, value_ranges)}
+
+    async def abatch_get_sheet_data(self, sheet_names):
+        """Получить данные нескольких листов одним batchGet из пула потоков"""
+        return await self._acall(f"batch reading Google Sheets {sheet_names}",
+                                 self.batch_get_sheet_data, sheet_names)
+
+    @staticmethod
+    def cell_update(sheet_name, row, col, value):
+        """Элемент data для values.batchUpdate: одна ячейка листа"""
+        return {
+            "range": "'{}'!{}".format(sheet_name.replace("'", "''"), rowcol_to_a1(row, col)),
+            "values": [[value]]
+        }
+
+    async def abatch_update_cells(self, data):
+        """Отправить изменения ячеек (элементы cell_update) одним values.batchUpdate"""
+        await self._acall("batch updating Google Sheets cells", self.spreadsheet.values_batch_update,
+                          {"valueInputOption": "RAW", "data": data})
 
     def create_worksheet(self, group_name):
         """Создать новый лист для группы"""
@@ -143,204 +588,586 @@ class GoogleSheetsHelper:
             
             # Обновляем кэш
             self.sheets[group_name] = worksheet
+            if self._is_group_sheet(group_name):
+                self.group_sheets.add(group_name)
+                self._sorted_group_sheets = None
             
-            logger.info(f"Created new worksheet: {group_name}")
+            logger.info("Created new worksheet: %s", group_name)
             return worksheet
             
         except Exception as e:
-            logger.error(f"Error creating worksheet {group_name}: {e}")
+            logger.error("Error creating worksheet %s: %s", group_name, e)
             raise
 
+    async def acreate_worksheet(self, group_name):
+        """Асинхронная версия create_worksheet: запросы идут в пуле потоков"""
+        async with self._structure_lock:
+            loop = asyncio.get_running_loop()
+            return await loop.run_in_executor(GSH_EXECUTOR, self.create_worksheet, group_name)
+
+    async def aarchive_worksheet(self, group_name):
+        """Асинхронная версия archive_worksheet: запросы идут в пуле потоков"""
+        async with self._structure_lock:
+            loop = asyncio.get_running_loop()
+            return await loop.run_in_executor(GSH_EXECUTOR, self.archive_worksheet, group_name)
+
+    async def aarchive_worksheets(self, group_names):
+        """Асинхронная версия archive_worksheets: запрос идет в пуле потоков"""
+        async with self._structure_lock:
+            loop = asyncio.get_running_loop()
+            return await loop.run_in_executor(GSH_EXECUTOR, self.archive_worksheets, group_names)
+
     def archive_worksheet(self, group_name):
         """Архивировать лист (переименовать)"""
+        return bool(self.archive_worksheets([group_name]))
+
+    def archive_worksheets(self, group_names):
+        """Архивировать листы (переименовать) одним batchUpdate; вернуть список архивированных"""
+        group_names = [name for name in dict.fromkeys(group_names) if name in self.sheets]
+        if not group_names:
+            return []
         try:
-            if group_name not in self.sheets:
-                return False
-                
-            spreadsheet = self.client.open("GSOM-PLANNER")
-            worksheet = self.sheets[group_name]
-            
-            # Создаем архивное название
-            archive_name = f"{group_name}_Archive_{datetime.now().strftime('%Y_%m')}"
-            worksheet.update_title(archive_name)
+            # Создаем архивные названия
+            suffix = datetime.now(MOSCOW_TZ).strftime('%Y_%m')
+            renames = [(name, self.sheets[name], f"{name}_Archive_{suffix}") for name in group_names]
+            self.spreadsheet.batch_update({"requests": [
+                {"updateSheetProperties": {
+                    "properties": {"sheetId": worksheet.id, "title": archive_name},
+                    "fields": "title",
+                }}
+                for _, worksheet, archive_name in renames
+            ]})
             
-            # Обновляем кэш
-            del self.sheets[group_name]
-            self.sheets[archive_name] = worksheet
+            for group_name, _, archive_name in renames:
+                logger.info("Archived worksheet: %s -> %s", group_name, archive_name)
             
-            logger.info(f"Archived worksheet: {group_name} -> {archive_name}")
-            return True
+            # Листы перечитываются из таблицы (один запрос на смену семестра),
+            # чтобы объекты листов получили новые названия
+            self._set_worksheets(self.spreadsheet.worksheets())
+            return group_names
             
         except Exception as e:
-            logger.error(f"Error archiving worksheet {group_name}: {e}")
-            return False
+            logger.error("Error archiving worksheets %s: %s", group_names, e)
+            return []
 
 # Инициализация помощника Google Sheets
 try:
     gsh = GoogleSheetsHelper()
 except Exception as e:
-    logger.critical(f"Failed to initialize Google Sheets Helper: {e}")
+    logger.critical("Failed to initialize Google Sheets Helper: %s", e)
     raise
 
+# Ожидающие записи по листам: {sheet_name: [(row, future), ...]}
+_pending_writes = {}
+# Ожидающие изменения ячеек (всех листов): [(cell_update, future), ...]
+_pending_cell_writes = []
+
+# ==================== КЭШ ДАННЫХ ТАБЛИЦЫ ====================
+# Кэш листов в порядке последнего обращения: {sheet_name: (data, expires_at)}
+_sheet_cache = OrderedDict()
+# Попадания в кэш по листам и листы, вытесненные ни разу не прочитанными
+_sheet_cache_hits = {}
+_sheet_cache_rejects = set()
+# Число строк листов: {sheet_name: (rowcount, expires_at)}; переживает вытеснение данных
+_sheet_rowcounts = {}
+
+def _sheet_cache_ttl():
+    """TTL записи кэша со случайным разбросом"""
+    return SHEET_CACHE_TTL * random.uniform(1 - SHEET_CACHE_TTL_JITTER, 1 + SHEET_CACHE_TTL_JITTER)
+
+def _lookup_sheet_cache(sheet_name):
+    """Вернуть актуальные данные листа из кэша или None"""
+    entry = _sheet_cache.get(sheet_name)
+    if entry and time.time() < entry[1]:
+        _sheet_cache.move_to_end(sheet_name)
+        _sheet_cache_hits[sheet_name] = _sheet_cache_hits.get(sheet_name, 0) + 1
+        return entry[0]
+    return None
+
+# Идущие загрузки листов: {sheet_name: asyncio.Task}
+_inflight_sheet_reads = {}
+
+async def _fetch_sheet_into_cache(sheet_name):
+    """Загрузить лист из таблицы и положить в кэш"""
+    data = await gsh.aget_sheet_data(sheet_name)
+    _store_sheet_cache(sheet_name, data, time.time() + _sheet_cache_ttl())
+    return data
+
+async def aget_cached_sheet_data(sheet_name):
+    """Получить данные листа из кэша (или из таблицы, если кэш устарел)
+    
+    Промах кэша не блокирует event loop: лист загружается в пуле потоков.
+    
+    Одновременные промахи по одному листу ждут общую загрузку, а не делают
+    каждый свой запрос к Google Sheets.
+    """
+    data = _lookup_sheet_cache(sheet_name)
+    if data is not None:
+        return data
+    task = _inflight_sheet_reads.get(sheet_name)
+    if task is None:
+        task = asyncio.ensure_future(_fetch_sheet_into_cache(sheet_name))
+        _inflight_sheet_reads[sheet_name] = task
+        task.add_done_callback(lambda _: _inflight_sheet_reads.pop(sheet_name, None))
+    # shield: отмена одного обработчика не должна обрывать загрузку для остальных
+    return await asyncio.shield(task)
+
+def _store_sheet_cache(sheet_name, data, expires_at):
+    """Положить лист в кэш, вытеснив лишние записи сверх лимита
+    
+    Лист, который уже вытеснялся без единого попадания, допускается в кэш
+    только со второго запроса подряд. Число строк запоминается всегда.
+    """
+    _sheet_rowcounts[sheet_name] = (len(data), expires_at)
+    if sheet_name in _sheet_cache_rejects:
+        _sheet_cache_rejects.discard(sheet_name)
+        return
+    _sheet_cache[sheet_name] = (data, expires_at)
+    _sheet_cache.move_to_end(sheet_name)
+    while len(_sheet_cache) > MAX_SHEET_CACHE_ENTRIES:
+        _evict_sheet_cache_entry()
+
+def _evict_sheet_cache_entry():
+    """Вытеснить из самых давних записей ту, что реже читалась и раньше истекает"""
+    window = max(1, int(len(_sheet_cache) * SHEET_CACHE_EVICT_WINDOW))
+    candidates = [name for name, _ in zip(_sheet_cache, range(window))]
+    victim = min(candidates, key=lambda name: (_sheet_cache_hits.get(name, 0), _sheet_cache[name][1]))
+    del _sheet_cache[victim]
+    if not _sheet_cache_hits.pop(victim, 0):
+        _sheet_cache_rejects.add(victim)
+
+async def awarm_sheet_cache(sheet_names):
+    """Загрузить в кэш все недостающие листы одним batchGet-запросом из пула потоков"""
+    now = time.time()
+    missing = [name for name in sheet_names
+               if name not in _sheet_cache or now >= _sheet_cache[name][1]]
+    if not missing:
+        return
+    fetched = await gsh.abatch_get_sheet_data(missing)
+    for sheet_name, data in fetched.items():
+        _store_sheet_cache(sheet_name, data, now + _sheet_cache_ttl())
+
+async def aget_sheet_rowcounts(sheet_names):
+    """Число строк листов {sheet_name: rowcount}; загружаются только листы без известного числа"""
+    now = time.time()
+    missing = [name for name in sheet_names
+               if name not in _sheet_rowcounts or now >= _sheet_rowcounts[name][1]]
+    if missing:
+        await awarm_sheet_cache(missing)
+    return {name: _sheet_rowcounts[name][0] for name in sheet_names}
+
+def _drop_sheet_cache_entry(sheet_name):
+    """Удалить запись кэша вместе со статистикой попаданий
+    
+    Следующая загрузка листа начинает счет попаданий заново, иначе давно
+    популярный лист навсегда защищен от вытеснения.
+    """
+    _sheet_cache.pop(sheet_name, None)
+    _sheet_cache_hits.pop(sheet_name, None)
+    _sheet_cache_rejects.discard(sheet_name)
+
+def prune_sheet_cache():
+    """Удалить из кэша записи с истекшим TTL"""
+    now = time.time()
+    for sheet_name, (_, expires_at) in list(_sheet_cache.items()):
+        if now >= expires_at:
+            _drop_sheet_cache_entry(sheet_name)
+    for sheet_name, (_, expires_at) in list(_sheet_rowcounts.items()):
+        if now >= expires_at:
+            del _sheet_rowcounts[sheet_name]
+
+def invalidate_sheet_cache(sheet_name=None):
+    """Сбросить кэш листа после записи (без аргумента — весь кэш)"""
+    if sheet_name is None:
+        _sheet_cache.clear()
+        _sheet_cache_hits.clear()
+        _sheet_cache_rejects.clear()
+        _sheet_rowcounts.clear()
+    else:
+        _drop_sheet_cache_entry(sheet_name)
+        _sheet_rowcounts.pop(sheet_name, None)
+
 # ==================== ВСПОМОГАТЕЛЬНЫЕ ФУНКЦИИ ====================
-def convert_to_datetime(time_str, date_str):
-    """Конвертировать строку времени и даты в datetime объект"""
+# Задачи отложенной отправки записей (ссылки держим до завершения)
+_write_flushes = set()
+
+async def _flush_after_debounce(take_batch, send):
+    """Через окно дебаунса забрать пачку ожидающих записей и отправить ее одним запросом
+    
+    Выполняется отдельной задачей, поэтому отмена обработчика, начавшего пачку,
+    не теряет чужие записи. Futures пачки завершаются в любом случае: результатом,
+    ошибкой запроса или отменой, если отменили сам сброс (например, при остановке бота).
+    """
+    batch = None
+    error = None
+    sent = False
     try:
-        time_parts = time_str.split('-')
-        start_time = time_parts[0]
+        await asyncio.sleep(WRITE_DEBOUNCE_DELAY)
+        batch = take_batch()
+        await send([item for item, _ in batch])
+        sent = True
+    except Exception as e:
+        error = e
+    finally:
+        if batch is None:
+            batch = take_batch()
+        for _, pending in batch:
+            if pending.done():
+                continue
+            if sent:
+                pending.set_result(True)
+            elif error is not None:
+                pending.set_exception(error)
+            else:
+                pending.cancel()
+
+def _start_flush(take_batch, send):
+    """Запустить отправку пачки записей отдельной задачей"""
+    task = asyncio.ensure_future(_flush_after_debounce(take_batch, send))
+    _write_flushes.add(task)
+    task.add_done_callback(_write_flushes.discard)
+
+async def append_row_batched(sheet_name, row):
+    """Добавить строку в лист, объединяя одновременные записи в один запрос"""
+    future = asyncio.get_running_loop().create_future()
+    batch = _pending_writes.setdefault(sheet_name, [])
+    batch.append((row, future))
+    
+    if len(batch) == 1:
+        # Первая запись в пачке запускает ее отправку после окна дебаунса
+        async def send(rows):
+            await gsh.aupdate_sheet(sheet_name, rows)
+            invalidate_sheet_cache(sheet_name)
+        _start_flush(lambda: _pending_writes.pop(sheet_name, []), send)
+    
+    # shield: отмена этого обработчика не отменяет результат для остальной пачки
+    return await asyncio.shield(future)
+
+def _take_cell_writes():
+    """Забрать накопленные изменения ячеек, начав новую пачку"""
+    global _pending_cell_writes
+    batch, _pending_cell_writes = _pending_cell_writes, []
+    return batch
+
+async def update_cell_batched(sheet_name, row, col, value):
+    """Изменить ячейку, объединяя одновременные изменения в один values.batchUpdate"""
+    future = asyncio.get_running_loop().create_future()
+    _pending_cell_writes.append((gsh.cell_update(sheet_name, row, col, value), future))
+    
+    if len(_pending_cell_writes) == 1:
+        # Первое изменение в пачке запускает ее отправку после окна дебаунса
+        _start_flush(_take_cell_writes, gsh.abatch_update_cells)
+    
+    return await asyncio.shield(future)
+
+# Текущее московское время, переиспользуемое в пределах секунды
+_now_cache = {"t": float("-inf"), "dt": None}
+
+def now_moscow():
+    """Текущее время по МСК с точностью до секунды (для дат и дедлайнов в цикле)"""
+    t = time.monotonic()
+    if t - _now_cache["t"] >= 1.0:
+        _now_cache["t"] = t
+        _now_cache["dt"] = datetime.now(MOSCOW_TZ)
+    return _now_cache["dt"]
+
+@lru_cache(maxsize=1024)
+def _month_day(date_str):
+    """(месяц, день) из строки ДД.ММ без создания datetime; None, если формат неверный"""
+    day, sep, month = date_str.partition('.')
+    if not (sep and day.isdigit() and month.isdigit()):
+        return None
+    return int(month), int(day)
+
+def convert_to_datetime(time_str, date_str, now=None):
+    """Конвертировать строку времени и даты в datetime объект
+    
+    now — текущее время по МСК; при разборе многих заданий передается один раз.
+    """
+    try:
+        start_time = time_str.split('-', 1)[0]
         
         # Парсим дату без года (день.месяц)
         day, month = map(int, date_str.split('.'))
         
         # Определяем правильный год
-        current_date = datetime.now(MOSCOW_TZ)
+        current_date = now or now_moscow()
         year = current_date.year
         
         # Если дата уже прошла в этом году, значит это на следующий год
-        proposed_date = datetime(year, month, day)
-        if proposed_date.date() < current_date.date():
+        if (month, day) < (current_date.month, current_date.day):
             year += 1
-            
-        dt = datetime(year, month, day)
         
-        # Добавляем время
-        if ':' in start_time and start_time not in ["By schedule", "По расписанию"]:
-            hours, minutes = map(int, start_time.split(':'))
-            dt = dt.replace(hour=hours, minute=minutes)
-        else:
-            # Для "By schedule", "По расписанию" ставим конец дня
-            dt = dt.replace(hour=23, minute=59)
-            
-        return MOSCOW_TZ.localize(dt)
+        # Для "By schedule", "По расписанию" ставим конец дня
+        if start_time in _SCHEDULE_MARKERS or ':' not in start_time:
+            return datetime(year, month, day, 23, 59, tzinfo=MOSCOW_TZ)
+        
+        hours, minutes = map(int, start_time.split(':'))
+        return datetime(year, month, day, hours, minutes, tzinfo=MOSCOW_TZ)
     except ValueError as e:
-        logger.error(f"Ошибка преобразования времени: {e}")
+        logger.error("Ошибка преобразования времени: %s", e)
         return None
 
+# Индекс строк листа Users по user_id: (данные листа, {user_id: номер строки})
+_users_index = (None, {})
+
+def _index_users(users):
+    """Индекс {user_id: номер строки} к снимку листа Users
+    
+    Индекс пересобирается только когда в кэше появляются новые данные листа.
+    """
+    global _users_index
+    if _users_index[0] is not users:
+        index = {}
+        for i, row in enumerate(users):
+            if len(row) > 0:
+                index.setdefault(row[0], i)
+        _users_index = (users, index)
+        _user_records.clear()
+    return users, _users_index[1]
+
+def get_users_index():
+    """Получить лист Users и индекс к нему только из кэша, без запроса к таблице
+    
+    Если листа в кэше нет, используется последний проиндексированный снимок.
+    Свежие данные дает aget_users_index.
+    """
+    users = _lookup_sheet_cache("Users")
+    if users is None:
+        users = _users_index[0] or []
+    return _index_users(users)
+
+async def aget_users_index():
+    """Получить лист Users и индекс к нему, догрузив лист без блокировки event loop"""
+    return _index_users(await aget_cached_sheet_data("Users"))
+
+# Разобранные строки Users: {user_id: данные}, живут до обновления листа в кэше
+_user_records = {}
+
+def _default_user_data():
+    """Настройки пользователя, которого нет в листе Users"""
+    return {"group": None, "reminders_enabled": True, "language": "ru", "feedback": "", "is_curator": False}
+
+def _parse_user_row(user_row):
+    """Разобрать строку листа Users в словарь настроек пользователя"""
+    return {
+        "group": user_row[1] if len(user_row) > 1 and user_row[1] != "" else None,
+        "reminders_enabled": len(user_row) > 2 and user_row[2] in _TRUE_VALUES,
+        "language": user_row[3] if len(user_row) > 3 and user_row[3] in LANGUAGES else "ru",
+        "feedback": user_row[4] if len(user_row) > 4 else "",
+        "is_curator": len(user_row) > 5 and user_row[5] in _TRUE_VALUES
+    }
+
 def get_user_data(user_id):
-    """Получить данные пользователя из таблицы"""
+    """Получить данные пользователя из таблицы
+    
+    Строка разбирается один раз на версию листа в кэше; возвращаемый словарь
+    общий для всех вызовов, изменять его нельзя.
+    """
     try:
-        users = gsh.get_sheet_data("Users")
-        user_row = next((row for row in users if len(row) > 0 and str(user_id) == row[0]), None)
-        if user_row:
-            return {
-                "group": user_row[1] if len(user_row) > 1 and user_row[1] != "" else None,
-                "reminders_enabled": len(user_row) > 2 and user_row[2].lower() == 'true',
-                "language": user_row[3] if len(user_row) > 3 and user_row[3] in LANGUAGES else "ru",
-                "feedback": user_row[4] if len(user_row) > 4 else "",
-                "is_curator": len(user_row) > 5 and user_row[5].lower() == 'true'
-            }
+        users, index = get_users_index()
+        key = str(user_id)
+        record = _user_records.get(key)
+        if record is not None:
+            return record
+        user_row_idx = index.get(key)
+        # Промахи не запоминаем: иначе любые отправители раздували бы кэш без ограничения,
+        # а поиск по индексу и так O(1)
+        if user_row_idx is None:
+            return _default_user_data()
+        record = _user_records[key] = _parse_user_row(users[user_row_idx])
+        return record
     except Exception as e:
-        logger.error(f"Error getting user data: {e}")
-    return {"group": None, "reminders_enabled": True, "language": "ru", "feedback": "", "is_curator": False}
-
-def update_user_data(user_id, field, value):
-    """Обновить данные пользователя"""
+        logger.error("Error getting user data: %s", e)
+    return _default_user_data()
+
+async def aget_user_data(user_id):
+    """Асинхронная версия get_user_data: лист Users догружается без блокировки event loop"""
+    await aget_users_index()
+    return get_user_data(user_id)
+
+def _locate_user_cell(user_id, field):
+    """Найти ячейку поля пользователя: (номер строки, номер столбца, строка) или None"""
+    users, index = get_users_index()
+    user_row_idx = index.get(str(user_id))
+    if user_row_idx is None:
+        return None
+    col_idx = _USER_COLS.get(field, _USER_COLS["group"])
+    return user_row_idx + 1, col_idx, users[user_row_idx]
+
+def _after_user_update(user_id, field, value, row, col_idx):
+    """Отразить записанное поле в кэше Users и обновить индекс групп"""
+    global _curators_cache
+    # Запись уже в таблице: правим закэшированную строку на месте, чтобы
+    # следующее чтение не скачивало лист Users заново
+    row.extend([""] * (col_idx - len(row)))
+    row[col_idx - 1] = str(value)
+    _user_records.pop(str(user_id), None)
+    
+    # Строка правится на месте, поэтому список кураторов сбрасываем явно
+    if field in ("group", "language", "is_curator"):
+        _curators_cache = (None, None)
+    
+    # Поддерживаем индекс группа -> пользователи в актуальном состоянии
+    if field in ("group", "reminders_enabled"):
+        group = str(value) if field == "group" else (row[1] if len(row) > 1 else "")
+        reminders_enabled = (str(value) in _TRUE_VALUES if field == "reminders_enabled"
+                             else len(row) > 2 and row[2] in _TRUE_VALUES)
+        _reindex_user(int(user_id), group, reminders_enabled)
+
+async def aupdate_user_data(user_id, field, value):
+    """Обновить поле пользователя в листе Users (запись идет в пуле потоков)
+    
+    Возвращает обновленные данные пользователя или None, если записать не удалось.
+    """
     try:
-        users = gsh.get_sheet_data("Users")
-        user_row_idx = next((i for i, row in enumerate(users) if len(row) > 0 and str(user_id) == row[0]), None)
-        
-        if user_row_idx is not None:
-            col_idx = {
-                "group": 2, 
-                "reminders_enabled": 3, 
-                "language": 4, 
-                "feedback": 5,
-                "is_curator": 6
-            }.get(field, 2)
-            
-            # Обновляем ячейку
-            gsh.sheets["Users"].update_cell(user_row_idx + 1, col_idx, str(value))
-            return True
+        await aget_users_index()
+        cell = _locate_user_cell(user_id, field)
+        if cell is not None:
+            row_number, col_idx, row = cell
+            await update_cell_batched("Users", row_number, col_idx, str(value))
+            _after_user_update(user_id, field, value, row, col_idx)
+            # Строка в кэше уже исправлена, повторного чтения листа не будет
+            return await aget_user_data(user_id)
     except Exception as e:
-        logger.error(f"Error updating user data: {e}")
-    return False
+        logger.error("Error updating user data: %s", e)
+    return None
 
-def add_new_user(user_id):
-    """Добавить нового пользователя в таблицу"""
+async def aadd_new_user(user_id):
+    """Добавить нового пользователя в таблицу, если его еще нет"""
     try:
-        # Проверяем, есть ли уже пользователь
-        users = gsh.get_sheet_data("Users")
-        if any(str(user_id) == row[0] for row in users if len(row) > 0):
+        _, index = await aget_users_index()
+        if str(user_id) in index:
             return True
-            
-        # Добавляем нового пользователя
+        
         new_user = [str(user_id), "", "TRUE", "ru", "", "FALSE"]
-        gsh.update_sheet("Users", new_user)
+        await gsh.aupdate_sheet("Users", new_user)
+        invalidate_sheet_cache("Users")
         return True
     except Exception as e:
-        logger.error(f"Error adding new user: {e}")
+        logger.error("Error adding new user: %s", e)
         return False
 
+# Список кураторов к листу Users: (данные листа, [куратор, ...])
+_curators_cache = (None, None)
+
 def get_all_curators():
-    """Получить список всех кураторов"""
+    """Получить список всех кураторов
+    
+    Список пересобирается только когда в кэше появляются новые данные листа
+    Users или меняется поле куратора.
+    """
+    global _curators_cache
     try:
-        users = gsh.get_sheet_data("Users")
-        curators = []
-        for row in users[1:]:  # Пропускаем заголовок
-            if len(row) > 5 and row[5].lower() == 'true':
-                curators.append({
-                    'user_id': row[0],
-                    'group': row[1] if len(row) > 1 else '',
-                    'language': row[3] if len(row) > 3 else 'ru'
-                })
-        return curators
+        # Только кэш: свежий лист догружает aget_all_curators
+        users, _ = get_users_index()
+        if _curators_cache[0] is not users:
+            # Строка длиннее 5 столбцов, поэтому группа и язык в ней точно есть
+            curators = [
+                {'user_id': row[0], 'group': row[1], 'language': row[3]}
+                for row in users[1:]  # Пропускаем заголовок
+                if len(row) > 5 and row[5] in _TRUE_VALUES
+            ]
+            _curators_cache = (users, curators)
+        return _curators_cache[1]
     except Exception as e:
-        logger.error(f"Error getting curators: {e}")
+        logger.error("Error getting curators: %s", e)
         return []
 
+async def aget_all_curators():
+    """Асинхронная версия get_all_curators: лист Users догружается без блокировки event loop"""
+    await aget_users_index()
+    return get_all_curators()
+
+# Индекс группа -> user_id пользователей с включенными напоминаниями
+_group_to_users = None
+# Обратный индекс user_id -> группа для тех же пользователей
+_user_to_group = {}
+
+def _rebuild_group_index(users):
+    """Пересобрать индексы групп по строкам листа Users"""
+    global _group_to_users, _user_to_group
+    index = {}
+    user_groups = {}
+    for row in users[1:]:  # Пропускаем заголовок
+        if len(row) > 2 and row[0].isdigit() and row[1] and row[2] in _TRUE_VALUES:
+            user_id = int(row[0])
+            index.setdefault(row[1], set()).add(user_id)
+            user_groups[user_id] = row[1]
+    _group_to_users, _user_to_group = index, user_groups
+
+def get_group_user_ids(group):
+    """Получить user_id пользователей группы с включенными напоминаниями
+    
+    Индекс строится по листу Users из кэша, без запроса к таблице.
+    """
+    if _group_to_users is None:
+        _rebuild_group_index(get_users_index()[0])
+    return _group_to_users.get(group, set())
+
+async def aget_group_user_ids(group):
+    """Асинхронная версия get_group_user_ids: лист Users догружается без блокировки event loop"""
+    if _group_to_users is None:
+        await aget_users_index()
+    return get_group_user_ids(group)
+
+def _reindex_user(user_id, group, reminders_enabled):
+    """Обновить положение пользователя в индексе групп"""
+    if _group_to_users is None:
+        return
+    # Прежняя группа известна из обратного индекса, без обхода всех групп
+    old_group = _user_to_group.pop(user_id, None)
+    if old_group is not None:
+        _group_to_users[old_group].discard(user_id)
+    if group and reminders_enabled:
+        _group_to_users.setdefault(group, set()).add(user_id)
+        _user_to_group[user_id] = group
+
 # ... (остальной код остается без изменений, как в предыдущем ответе)
 # ==================== КЛАВИАТУРЫ ====================
+@lru_cache(maxsize=4)
 def main_menu_keyboard(user_lang="ru", is_curator=False):
-    """Клавиатура главного меню с правильным расположением кнопок"""
+    """Клавиатура главного меню с правильным расположением кнопок
+    
+    Кэшируется: всего 4 комбинации (язык × роль), а InlineKeyboardMarkup неизменяем.
+    """
+    keyboard = [
+        [InlineKeyboardButton(
+            "📚 Посмотреть задания" if user_lang == "ru" else "📚 View tasks", 
+            callback_data="get_data")],
+        [
+            InlineKeyboardButton(
+                "🏫 Выбор группы" if user_lang == "ru" else "🏫 Select group", 
+                callback_data="select_group"),
+            InlineKeyboardButton(
+                "⚙️ Функционал" if user_lang == "ru" else "⚙️ Features", 
+                callback_data="help")
+        ],
+        [InlineKeyboardButton(
+            "🏠 Назад в меню" if user_lang == "ru" else "🏠 Back to menu", 
+            callback_data="back_to_menu")]
+    ]
+    
+    # Кураторам — еще ряд добавления/удаления заданий после просмотра
     if is_curator:
-        # Для кураторов: все кнопки
-        keyboard = [
-            [InlineKeyboardButton(
-                "📚 Посмотреть задания" if user_lang == "ru" else "📚 View tasks", 
-                callback_data="get_data")],
-            [
-                InlineKeyboardButton(
-                    "⚡ Добавить задание" if user_lang == "ru" else "⚡ Add task", 
-                    callback_data="add_task"),
-                InlineKeyboardButton(
-                    "💣 Удалить задание" if user_lang == "ru" else "💣 Delete task", 
-                    callback_data="delete_task")
-            ],
-            [
-                InlineKeyboardButton(
-                    "🏫 Выбор группы" if user_lang == "ru" else "🏫 Select group", 
-                    callback_data="select_group"),
-                InlineKeyboardButton(
-                    "⚙️ Функционал" if user_lang == "ru" else "⚙️ Features", 
-                    callback_data="help")
-            ],
-            [InlineKeyboardButton(
-                "🏠 Назад в меню" if user_lang == "ru" else "🏠 Back to menu", 
-                callback_data="back_to_menu")]
-        ]
-    else:
-        # Для обычных пользователей: только просмотр и настройки
-        keyboard = [
-            [InlineKeyboardButton(
-                "📚 Посмотреть задания" if user_lang == "ru" else "📚 View tasks", 
-                callback_data="get_data")],
-            [
-                InlineKeyboardButton(
-                    "🏫 Выбор группы" if user_lang == "ru" else "🏫 Select group", 
-                    callback_data="select_group"),
-                InlineKeyboardButton(
-                    "⚙️ Функционал" if user_lang == "ru" else "⚙️ Features", 
-                    callback_data="help")
-            ],
-            [InlineKeyboardButton(
-                "🏠 Назад в меню" if user_lang == "ru" else "🏠 Back to menu", 
-                callback_data="back_to_menu")]
-        ]
+        keyboard.insert(1, [
+            InlineKeyboardButton(
+                "⚡ Добавить задание" if user_lang == "ru" else "⚡ Add task", 
+                callback_data="add_task"),
+            InlineKeyboardButton(
+                "💣 Удалить задание" if user_lang == "ru" else "💣 Delete task", 
+                callback_data="delete_task")
+        ])
     
     return InlineKeyboardMarkup(keyboard)
 
 def help_keyboard(user_lang="ru", user_id=None):
     """Клавиатура для раздела помощи/функционала"""
+    return _help_keyboard(user_lang, user_id in SUPER_ADMINS)
+
+@lru_cache(maxsize=4)
+def _help_keyboard(user_lang, is_admin):
+    """Кэшируемая часть help_keyboard: зависит только от языка и роли"""
     keyboard = [
         [InlineKeyboardButton(
             "🔔 Настройки напоминаний" if user_lang == "ru" else "🔔 Reminder settings", 
@@ -354,7 +1181,7 @@ def help_keyboard(user_lang="ru", user_id=None):
     ]
     
     # Добавляем кнопку админ-панели только для суперадминов
-    if user_id in SUPER_ADMINS:
+    if is_admin:
         keyboard.append([InlineKeyboardButton(
             "👑 Админ-панель" if user_lang == "ru" else "👑 Admin panel", 
             callback_data="admin_panel")])
@@ -365,6 +1192,7 @@ def help_keyboard(user_lang="ru", user_id=None):
     
     return InlineKeyboardMarkup(keyboard)
 
+@lru_cache(maxsize=4)
 def admin_keyboard(user_lang="ru"):
     """Клавиатура админ-панели"""
     keyboard = [
@@ -376,6 +1204,53 @@ def admin_keyboard(user_lang="ru"):
     ]
     return InlineKeyboardMarkup(keyboard)
 
+@lru_cache(maxsize=4)
+def new_semester_confirm_keyboard(user_lang="ru"):
+    """Подтверждение начала нового семестра"""
+    return InlineKeyboardMarkup([
+        [InlineKeyboardButton("✅ Да, начать новый семестр" if user_lang == "ru" else "✅ Yes, start new semester", callback_data="confirm_new_semester")],
+        [InlineKeyboardButton("❌ Отмена" if user_lang == "ru" else "❌ Cancel", callback_data="admin_panel")]
+    ])
+
+@lru_cache(maxsize=4)
+def group_select_keyboard(user_lang="ru"):
+    """Клавиатура выбора группы"""
+    return InlineKeyboardMarkup([
+        [InlineKeyboardButton("B-11", callback_data="set_group_B-11"),
+         InlineKeyboardButton("B-12", callback_data="set_group_B-12")],
+        [InlineKeyboardButton(
+            "↩️ Назад в меню" if user_lang == "ru" else "↩️ Back to menu", 
+            callback_data="back_to_menu")]
+    ])
+
+@lru_cache(maxsize=8)
+def reminder_settings_keyboard(user_lang="ru", reminders_enabled=True):
+    """Клавиатура настроек напоминаний"""
+    return InlineKeyboardMarkup([
+        [InlineKeyboardButton(
+            "🔔 Напоминания: Вкл" if reminders_enabled else "🔔 Напоминания: Выкл",
+            callback_data="toggle_reminders")],
+        [InlineKeyboardButton(
+            "↩️ Назад в меню" if user_lang == "ru" else "↩️ Back to menu",
+            callback_data="back_to_menu")]
+    ])
+
+@lru_cache(maxsize=4)
+def language_keyboard(user_lang="ru"):
+    """Клавиатура выбора языка"""
+    return InlineKeyboardMarkup([
+        [InlineKeyboardButton("🇷🇺 Русский", callback_data="set_lang_ru")],
+        [InlineKeyboardButton("🇬🇧 English", callback_data="set_lang_en")],
+        [InlineKeyboardButton("↩️ Назад" if user_lang == "ru" else "↩️ Back", callback_data="back_to_menu")]
+    ])
+
+@lru_cache(maxsize=4)
+def feedback_cancel_keyboard(user_lang="ru"):
+    """Кнопка отмены отправки отзыва"""
+    return InlineKeyboardMarkup([[InlineKeyboardButton(
+        MESSAGES[user_lang]["feedback_cancel_button"], callback_data="cancel_feedback")]])
+
+@lru_cache(maxsize=4)
 def generate_edit_task_keyboard(user_lang="ru"):
     return InlineKeyboardMarkup([
         [
@@ -404,7 +1279,9 @@ def generate_edit_task_keyboard(user_lang="ru"):
         ]
     ])
 
-# Генераторы клавиатур для редактирования задания (остаются без изменений)
+# Генераторы клавиатур для редактирования задания
+# Зависят только от языка, поэтому кэшируются: InlineKeyboardMarkup неизменяем
+@lru_cache(maxsize=4)
 def generate_subject_keyboard(user_lang="ru"):
     return InlineKeyboardMarkup([
         [InlineKeyboardButton("Entrepreneurship", callback_data="Entrepreneurship"),
@@ -417,6 +1294,7 @@ def generate_subject_keyboard(user_lang="ru"):
         [InlineKeyboardButton("↩️ Назад к редактированию" if user_lang == "ru" else "↩️ Back to editing", callback_data="back_to_editing")]
     ])
 
+@lru_cache(maxsize=4)
 def generate_task_type_keyboard(user_lang="ru"):
     return InlineKeyboardMarkup([
         [InlineKeyboardButton("Test", callback_data="Test"),
@@ -427,6 +1305,7 @@ def generate_task_type_keyboard(user_lang="ru"):
         [InlineKeyboardButton("↩️ Назад к редактированию" if user_lang == "ru" else "↩️ Back to editing", callback_data="back_to_editing")]
     ])
 
+@lru_cache(maxsize=4)
 def generate_points_keyboard(user_lang="ru"):
     return InlineKeyboardMarkup([
         [InlineKeyboardButton("5", callback_data="points_5"),
@@ -437,6 +1316,7 @@ def generate_points_keyboard(user_lang="ru"):
         [InlineKeyboardButton("↩️ Назад к редактированию" if user_lang == "ru" else "↩️ Back to editing", callback_data="back_to_editing")]
     ])
 
+@lru_cache(maxsize=4)
 def generate_time_keyboard(user_lang="ru"):
     return InlineKeyboardMarkup([
         [InlineKeyboardButton("10:00", callback_data="time_10:00"),
@@ -450,28 +1330,37 @@ def generate_time_keyboard(user_lang="ru"):
         [InlineKeyboardButton("↩️ Назад к редактированию" if user_lang == "ru" else "↩️ Back to editing", callback_data="back_to_editing")]
     ])
 
+# Смещения дат для клавиатуры выбора даты: завтра и еще 27 дней
+_DATE_BUTTON_OFFSETS = tuple(timedelta(days=i) for i in range(1, 29))
+# Клавиатуры дат на текущий московский день: {(дата, язык): InlineKeyboardMarkup}
+_date_keyboard_cache = {}
+
 def generate_date_buttons(user_lang="ru"):
-    today = datetime.now(MOSCOW_TZ)
-    buttons = []
-    row_buttons = []
-    
-    for i in range(28):
-        date = today + timedelta(days=i+1)
-        date_str = date.strftime("%d.%m")
-        day_name = date.strftime("%a")
-        
-        btn_text = f"{date_str} ({day_name})"
-        row_buttons.append(InlineKeyboardButton(btn_text, callback_data=date_str))
-        
-        if len(row_buttons) == 4 or i == 27:
-            buttons.append(row_buttons)
-            row_buttons = []
+    today = now_moscow()
+    key = (today.date(), user_lang)
+    markup = _date_keyboard_cache.get(key)
+    if markup is not None:
+        return markup
+    
+    # Клавиатура одинакова для всех в пределах дня: при смене даты старые убираем
+    if any(cached_day != key[0] for cached_day, _ in _date_keyboard_cache):
+        _date_keyboard_cache.clear()
+    
+    labels = [(today + offset).strftime("%d.%m (%a)") for offset in _DATE_BUTTON_OFFSETS]
+    # По 4 даты в ряд
+    buttons = [
+        [InlineKeyboardButton(label, callback_data=label[:5]) for label in chunk]
+        for chunk in batched(labels, 4)
+    ]
     
     buttons.append([InlineKeyboardButton("✏️ Ввести свою дату" if user_lang == "ru" else "✏️ Enter custom date", callback_data="custom_date")])
     buttons.append([InlineKeyboardButton("↩️ Назад к редактированию" if user_lang == "ru" else "↩️ Back to editing", callback_data="back_to_editing")])
     
-    return InlineKeyboardMarkup(buttons)
+    markup = InlineKeyboardMarkup(buttons)
+    _date_keyboard_cache[key] = markup
+    return markup
 
+@lru_cache(maxsize=4)
 def generate_format_keyboard(user_lang="ru"):
     return InlineKeyboardMarkup([
         [InlineKeyboardButton("Online", callback_data="Online"),
@@ -479,6 +1368,7 @@ def generate_format_keyboard(user_lang="ru"):
         [InlineKeyboardButton("↩️ Назад к редактированию" if user_lang == "ru" else "↩️ Back to editing", callback_data="back_to_editing")]
     ])
 
+@lru_cache(maxsize=4)
 def generate_details_keyboard(user_lang="ru"):
     return InlineKeyboardMarkup([
         [InlineKeyboardButton("Calculators allowed", callback_data="Calculators allowed")],
@@ -488,150 +1378,157 @@ def generate_details_keyboard(user_lang="ru"):
         [InlineKeyboardButton("↩️ Назад к редактированию" if user_lang == "ru" else "↩️ Back to editing", callback_data="back_to_editing")]
     ])
 
+# Кнопки выбора параметра задания: callback_data -> клавиатура вариантов
+_EDIT_PICKERS = {
+    "edit_subject": generate_subject_keyboard,
+    "edit_task_type": generate_task_type_keyboard,
+    "edit_max_points": generate_points_keyboard,
+    "edit_date": generate_date_buttons,
+    "edit_time": generate_time_keyboard,
+    "edit_format": generate_format_keyboard,
+    "edit_details": generate_details_keyboard,
+}
+# Кнопки готовых значений параметра: callback_data (оно же значение) -> поле задания
+_EDIT_CHOICE_FIELDS = {
+    **dict.fromkeys(_SUBJECTS, "subject"),
+    **dict.fromkeys(_TASK_TYPES, "task_type"),
+    "Online": "format",
+    "Offline": "format",
+    "open-book": "book_type",
+    "closed-book": "book_type",
+    "Calculators allowed": "details",
+    "Notes allowed": "details",
+    "Phones allowed": "details",
+}
+# Кнопки ручного ввода параметра: callback_data -> поле задания
+_EDIT_INPUT_FIELDS = {
+    "other_subject": "subject",
+    "other_task_type": "task_type",
+    "other_max_points": "max_points",
+    "custom_date": "date",
+    "other_details": "details",
+}
+_EDIT_INPUT_TARGETS = frozenset(_EDIT_INPUT_FIELDS.values())
+
+def _any_of_pattern(values):
+    """Шаблон точного совпадения callback_data с одним из значений"""
+    return re.compile("^(?:" + "|".join(map(re.escape, values)) + ")$")
+
+# Шаблоны callback_data для обработчиков состояния EDITING_TASK
+EDIT_TASK_PATTERNS = {
+    "picker": _any_of_pattern(_EDIT_PICKERS),
+    "input": _any_of_pattern(_EDIT_INPUT_FIELDS),
+    "value": re.compile(
+        _any_of_pattern([*_EDIT_CHOICE_FIELDS, "back_to_editing"]).pattern
+        + r"|^points_.+$|^\d\d\.\d\d$|^time_.+$"
+    ),
+    "save": re.compile(r"^save_task$"),
+    "cancel": re.compile(r"^cancel_task$"),
+}
+
 # ==================== ОСНОВНЫЕ ОБРАБОТЧИКИ ====================
+def require_super_admin(handler):
+    """Пропускать к обработчику кнопки только суперадминов; обработчик получает query"""
+    @wraps(handler)
+    async def wrapper(update: Update, context: ContextTypes.DEFAULT_TYPE):
+        query = update.callback_query
+        await query.answer()
+        if query.from_user.id not in SUPER_ADMINS:
+            await query.edit_message_text("❌ Доступ запрещен")
+            return None
+        return await handler(update, context, query)
+    return wrapper
+
 async def start(update: Update, context: ContextTypes.DEFAULT_TYPE):
     """Обработчик команды /start"""
     user_id = update.effective_user.id
     
     # Добавляем пользователя в систему если его нет
-    if not add_new_user(user_id):
+    if not await aadd_new_user(user_id):
         await update.message.reply_text("❌ Ошибка при регистрации. Попробуйте позже.")
         return
     
-    user_data = get_user_data(user_id)
-    
-    welcome_text = (
-        "👋 Привет! Добро пожаловать в *GSOMPASS бот*.\n\n"
-        "Выберите действие ниже:" 
-        if user_data["language"] == "ru" else 
-        "👋 Hi! Welcome to *GSOMPASS bot*.\n\n"
-        "Choose an action below:"
-    )
+    user_data = await aget_user_data(user_id)
+    lang = user_data["language"]
     
     await update.message.reply_text(
-        welcome_text,
-        reply_markup=main_menu_keyboard(user_data["language"], user_data["is_curator"]),
+        MESSAGES[lang]["welcome"],
+        reply_markup=main_menu_keyboard(lang, user_data["is_curator"]),
         parse_mode='Markdown'
     )
 
 async def callback_back_to_menu(update: Update, context: ContextTypes.DEFAULT_TYPE):
     """Возврат в главное меню"""
     query = update.callback_query
-    await query.answer()
-    user_data = get_user_data(query.from_user.id)
+    _, user_data = await asyncio.gather(query.answer(), aget_user_data(query.from_user.id))
+    lang = user_data["language"]
     
     await query.edit_message_text(
-        "👋 Вы вернулись в главное меню. Выберите действие:" 
-        if user_data["language"] == "ru" else 
-        "👋 You're back to the main menu. Choose an action:",
-        reply_markup=main_menu_keyboard(user_data["language"], user_data["is_curator"])
+        MESSAGES[lang]["back_to_menu"],
+        reply_markup=main_menu_keyboard(lang, user_data["is_curator"])
     )
 
 async def callback_help(update: Update, context: ContextTypes.DEFAULT_TYPE):
     """Показать справку"""
     query = update.callback_query
-    await query.answer()
     user_id = query.from_user.id
-    user_data = get_user_data(user_id)
-    
-    keyboard = [
-        [InlineKeyboardButton("🔔 Настройки напоминаний" if user_data["language"] == "ru" else "🔔 Reminder settings", 
-                            callback_data="reminder_settings")],
-        [InlineKeyboardButton("🌐 Изменить язык" if user_data["language"] == "ru" else "🌐 Change language", 
-                            callback_data="language_settings")],
-        [InlineKeyboardButton("📝 Оставить фидбэк" if user_data["language"] == "ru" else "📝 Leave feedback", 
-                            callback_data="leave_feedback")],
-    ]
-    
-    # Добавляем кнопку админ-панели только для суперадминов
-    if user_id in SUPER_ADMINS:
-        keyboard.append([InlineKeyboardButton("👑 Админ-панель" if user_data["language"] == "ru" else "👑 Admin panel", 
-                                           callback_data="admin_panel")])
-    
-    keyboard.append([InlineKeyboardButton("↩️ Назад в меню" if user_data["language"] == "ru" else "↩️ Back to menu", 
-                                       callback_data="back_to_menu")])
-    
-    help_text = (
-        "📌 Возможности бота:\n\n"
-        "• 📋 Посмотреть задания своей группы\n"
-        "• ➕ Добавить задание (для кураторов)\n"
-        "• 🗑️ Удалить задание (для кураторов)\n"
-        "• 🗓️ Данные берутся из Google Таблицы\n"
-        "• 🔔 Напоминания о заданиями\n"
-        "• 👥 Выбор/изменение группы\n"
-        "• 📝 Отправить отзыв разработчику\n"
-        "• 🔒 Доступ к изменению только у кураторов" 
-        if user_data["language"] == "ru" else 
-        "📌 Bot features:\n\n"
-        "• 📋 View tasks for your group\n"
-        "• ➕ Add task (for curators)\n"
-        "• 🗑️ Delete task (for curators)\n"
-        "• 🗓️ Data is taken from Google Sheets\n"
-        "• 🔔 Task reminders\n"
-        "• 👥 Select/change group\n"
-        "• 📝 Send feedback to developer\n"
-        "• 🔒 Only curators can make changes"
-    )
+    _, user_data = await asyncio.gather(query.answer(), aget_user_data(user_id))
+    lang = user_data["language"]
     
     await query.edit_message_text(
-        help_text,
-        reply_markup=InlineKeyboardMarkup(keyboard)
+        MESSAGES[lang]["help"],
+        reply_markup=help_keyboard(lang, user_id)
     )
 
-async def callback_admin_panel(update: Update, context: ContextTypes.DEFAULT_TYPE):
+@require_super_admin
+async def callback_admin_panel(update: Update, context: ContextTypes.DEFAULT_TYPE, query):
     """Админ-панель для суперадмина"""
-    query = update.callback_query
-    await query.answer()
     user_id = query.from_user.id
     
-    if user_id not in SUPER_ADMINS:
-        await query.edit_message_text("❌ Доступ запрещен")
-        return
-        
-    user_data = get_user_data(user_id)
+    user_data = await aget_user_data(user_id)
+    lang = user_data["language"]
     
     await query.edit_message_text(
-        "👑 *АДМИН-ПАНЕЛЬ*\n\n"
-        "Выберите действие:" 
-        if user_data["language"] == "ru" else 
-        "👑 *ADMIN PANEL*\n\n"
-        "Choose an action:",
-        reply_markup=admin_keyboard(user_data["language"]),
+        MESSAGES[lang]["admin_panel"],
+        reply_markup=admin_keyboard(lang),
         parse_mode='Markdown'
     )
 
 # ==================== СИСТЕМА КУРАТОРОВ ====================
-async def admin_make_curator(update: Update, context: ContextTypes.DEFAULT_TYPE):
+@require_super_admin
+async def admin_make_curator(update: Update, context: ContextTypes.DEFAULT_TYPE, query):
     """Начать процесс назначения куратора"""
-    query = update.callback_query
-    await query.answer()
     user_id = query.from_user.id
     
-    if user_id not in SUPER_ADMINS:
-        await query.edit_message_text("❌ Доступ запрещен")
-        return
-        
-    user_data = get_user_data(user_id)
+    user_data = await aget_user_data(user_id)
     
     await query.edit_message_text(
-        "👥 *Назначение куратора*\n\n"
-        "Введите user_id пользователя (только цифры):\n\n"
-        "Как получить user_id:\n"
-        "1. Попросите пользователя написать /start боту\n"
-        "2. Скопируйте цифры из его профиля Telegram\n"
-        "3. Отправьте мне эти цифры" 
-        if user_data["language"] == "ru" else 
-        "👥 *Make Curator*\n\n"
-        "Enter user_id (numbers only):\n\n"
-        "How to get user_id:\n"
-        "1. Ask user to type /start to the bot\n"
-        "2. Copy numbers from their Telegram profile\n"
-        "3. Send me these numbers",
+        MESSAGES[user_data["language"]]["make_curator"],
         parse_mode='Markdown'
     )
     
     return WAITING_FOR_CURATOR_ID
 
+async def _notify_new_curator(bot, curator_id, admin_chat_id):
+    """Попросить нового куратора ввести группу; при неудаче сообщить админу"""
+    try:
+        await bot.send_message(
+            curator_id,
+            "🎉 *ВЫ НАЗНАЧЕНЫ КУРАТОРОМ!*\n\n"
+            "Пожалуйста, введите название вашей группы:\n"
+            "• Например: B-13, M-22, A-24\n"
+            "• Только латинские буквы и цифры\n"
+            "• Формат: Буква-Цифры (B-13)",
+            parse_mode='Markdown'
+        )
+    except Exception as e:
+        logger.error("Error notifying curator %s: %s", curator_id, e)
+        await bot.send_message(
+            admin_chat_id,
+            "✅ Куратор назначен, но не удалось отправить уведомление.\n"
+            "Попросите его ввести название группы через бота."
+        )
+
 async def handle_curator_id(update: Update, context: ContextTypes.DEFAULT_TYPE):
     """Обработка введенного user_id куратора"""
     user_id = update.effective_user.id
@@ -646,8 +1543,8 @@ async def handle_curator_id(update: Update, context: ContextTypes.DEFAULT_TYPE):
         curator_id = int(user_input)
         
         # Проверяем что пользователь есть в системе
-        users = gsh.get_sheet_data("Users")
-        user_exists = any(str(curator_id) == row[0] for row in users if len(row) > 0)
+        _, index = await aget_users_index()
+        user_exists = str(curator_id) in index
         
         if not user_exists:
             await update.message.reply_text(
@@ -657,31 +1554,15 @@ async def handle_curator_id(update: Update, context: ContextTypes.DEFAULT_TYPE):
             return ConversationHandler.END
         
         # Назначаем куратором
-        success = update_user_data(curator_id, "is_curator", True)
-        
-        if success:
+        if await aupdate_user_data(curator_id, "is_curator", True) is not None:
+            # Уведомление куратору уходит в фоне, не задерживая ответ админу
+            context.application.create_task(
+                _notify_new_curator(context.bot, curator_id, update.effective_chat.id)
+            )
             await update.message.reply_text(
                 f"✅ Пользователь {curator_id} теперь куратор!\n\n"
                 "Бот автоматически запросит у него название группы."
             )
-            
-            # Отправляем уведомление новому куратору
-            try:
-                await context.bot.send_message(
-                    curator_id,
-                    "🎉 *ВЫ НАЗНАЧЕНЫ КУРАТОРОМ!*\n\n"
-                    "Пожалуйста, введите название вашей группы:\n"
-                    "• Например: B-13, M-22, A-24\n"
-                    "• Только латинские буквы и цифры\n"
-                    "• Формат: Буква-Цифры (B-13)",
-                    parse_mode='Markdown'
-                )
-            except Exception as e:
-                logger.error(f"Error notifying curator {curator_id}: {e}")
-                await update.message.reply_text(
-                    f"✅ Куратор назначен, но не удалось отправить уведомление.\n"
-                    f"Попросите его ввести название группы через бота."
-                )
         else:
             await update.message.reply_text("❌ Ошибка при назначении куратора")
             
@@ -695,13 +1576,13 @@ async def handle_group_input(update: Update, context: ContextTypes.DEFAULT_TYPE)
     user_id = update.effective_user.id
     group_name = update.message.text.strip().upper()  # Приводим к верхнему регистру
     
-    user_data = get_user_data(user_id)
+    user_data = await aget_user_data(user_id)
     if not user_data.get("is_curator", False):
         await update.message.reply_text("❌ У вас нет прав куратора")
         return
     
     # Валидация названия группы
-    if not re.match(r'^[A-Z]-\d{2,3}$', group_name):
+    if not _GROUP_NAME_RE.match(group_name):
         await update.message.reply_text(
             "❌ Неверный формат группы!\n\n"
             "Используйте формат: *Буква-Цифры*\n"
@@ -711,19 +1592,24 @@ async def handle_group_input(update: Update, context: ContextTypes.DEFAULT_TYPE)
         )
         return
     
+    # Запросы к таблице занимают секунды — сразу показываем, что работа идет
+    progress = await update.message.reply_text("⏳ Создаю лист группы...")
+    
     # Архивируем старый лист если он есть
     old_group = user_data.get("group")
     if old_group and old_group in gsh.sheets:
-        gsh.archive_worksheet(old_group)
+        await gsh.aarchive_worksheet(old_group)
+        invalidate_sheet_cache(old_group)
     
     # Создаем новый лист
     try:
-        gsh.create_worksheet(group_name)
+        await gsh.acreate_worksheet(group_name)
+        invalidate_sheet_cache(group_name)
         
         # Устанавливаем группу куратору
-        update_user_data(user_id, "group", group_name)
+        await aupdate_user_data(user_id, "group", group_name)
         
-        await update.message.reply_text(
+        await progress.edit_text(
             f"✅ *Группа {group_name} установлена!*\n\n"
             f"Лист '{group_name}' создан в таблице.\n"
             f"Старые данные архивированы.\n\n"
@@ -736,115 +1622,97 @@ async def handle_group_input(update: Update, context: ContextTypes.DEFAULT_TYPE)
         )
         
     except Exception as e:
-        logger.error(f"Error creating worksheet: {e}")
-        await update.message.reply_text(
+        logger.error("Error creating worksheet: %s", e)
+        await progress.edit_text(
             "❌ Ошибка при создании листа. Попробуйте другое название группы."
         )
 
-async def admin_list_curators(update: Update, context: ContextTypes.DEFAULT_TYPE):
+@require_super_admin
+async def admin_list_curators(update: Update, context: ContextTypes.DEFAULT_TYPE, query):
     """Показать список всех кураторов"""
-    query = update.callback_query
-    await query.answer()
     user_id = query.from_user.id
     
-    if user_id not in SUPER_ADMINS:
-        await query.edit_message_text("❌ Доступ запрещен")
-        return
-        
-    user_data = get_user_data(user_id)
-    curators = get_all_curators()
+    # Настройки админа и список кураторов читаются из одного листа, запросы идут параллельно
+    user_data, curators = await asyncio.gather(aget_user_data(user_id), aget_all_curators())
     
     if not curators:
         await query.edit_message_text("📋 Список кураторов пуст")
         return
     
-    response = "📋 *СПИСОК КУРАТОРОВ:*\n\n" if user_data["language"] == "ru" else "📋 *CURATORS LIST:*\n\n"
-    
+    # Строки собираются в список и склеиваются один раз
+    parts = [MESSAGES[user_data["language"]]["curators_list"]]
     for curator in curators:
         status = f"Группа: {curator['group']}" if curator['group'] else "Группа не установлена"
-        response += f"• ID: {curator['user_id']} | {status}\n"
+        parts.append(f"• ID: {curator['user_id']} | {status}\n")
     
-    await query.edit_message_text(response, parse_mode='Markdown')
+    await query.edit_message_text("".join(parts), parse_mode='Markdown')
 
-async def admin_new_semester(update: Update, context: ContextTypes.DEFAULT_TYPE):
+@require_super_admin
+async def admin_new_semester(update: Update, context: ContextTypes.DEFAULT_TYPE, query):
     """Запуск нового семестра"""
-    query = update.callback_query
-    await query.answer()
     user_id = query.from_user.id
     
-    if user_id not in SUPER_ADMINS:
-        await query.edit_message_text("❌ Доступ запрещен")
-        return
-        
-    user_data = get_user_data(user_id)
-    
-    # Подтверждение
-    confirm_keyboard = [
-        [InlineKeyboardButton("✅ Да, начать новый семестр" if user_data["language"] == "ru" else "✅ Yes, start new semester", callback_data="confirm_new_semester")],
-        [InlineKeyboardButton("❌ Отмена" if user_data["language"] == "ru" else "❌ Cancel", callback_data="admin_panel")]
-    ]
+    user_data = await aget_user_data(user_id)
+    lang = user_data["language"]
     
     await query.edit_message_text(
-        "🎓 *НОВЫЙ СЕМЕСТР*\n\n"
-        "Это действие:\n"
-        "• Архивирует все текущие листы групп\n"
-        "• Сбросит группы у всех кураторов\n"
-        "• Попросит кураторов ввести новые названия групп\n"
-        "• Создаст новые чистые листы\n\n"
-        "Продолжить?" 
-        if user_data["language"] == "ru" else 
-        "🎓 *NEW SEMESTER*\n\n"
-        "This action will:\n"
-        "• Archive all current group sheets\n"
-        "• Reset groups for all curators\n"
-        "• Ask curators to enter new group names\n"
-        "• Create new clean sheets\n\n"
-        "Continue?",
-        reply_markup=InlineKeyboardMarkup(confirm_keyboard),
+        MESSAGES[lang]["new_semester_confirm"],
+        reply_markup=new_semester_confirm_keyboard(lang),
         parse_mode='Markdown'
     )
 
-async def confirm_new_semester(update: Update, context: ContextTypes.DEFAULT_TYPE):
+async def _send_notification(bot, chat_id, text, semaphore):
+    """Отправить уведомление в Markdown; True, если доставлено"""
+    async with semaphore:
+        try:
+            await bot.send_message(chat_id, text, parse_mode='Markdown')
+            return True
+        except Exception as e:
+            logger.error("Error notifying curator %s: %s", chat_id, e)
+            return False
+
+@require_super_admin
+async def confirm_new_semester(update: Update, context: ContextTypes.DEFAULT_TYPE, query):
     """Подтверждение начала нового семестра"""
-    query = update.callback_query
-    await query.answer()
     user_id = query.from_user.id
     
-    if user_id not in SUPER_ADMINS:
-        await query.edit_message_text("❌ Доступ запрещен")
-        return
-        
-    user_data = get_user_data(user_id)
+    user_data = await aget_user_data(user_id)
+    lang = user_data["language"]
     
     try:
         # Архивируем все активные листы групп
-        curators = get_all_curators()
-        archived_count = 0
-        notified_count = 0
+        curators = await aget_all_curators()
         
-        for curator in curators:
-            if curator['group'] and curator['group'] in gsh.sheets:
-                if gsh.archive_worksheet(curator['group']):
-                    archived_count += 1
-                # Сбрасываем группу у куратора
-                update_user_data(int(curator['user_id']), "group", "")
+        active = [curator for curator in curators if curator['group'] and curator['group'] in gsh.sheets]
+        # Все листы переименовываются одним batchUpdate
+        archived = await gsh.aarchive_worksheets([curator['group'] for curator in active])
+        for group_name in archived:
+            invalidate_sheet_cache(group_name)
+        archived_count = len(archived)
         
-        # Уведомляем всех кураторов
-        for curator in curators:
-            try:
-                await context.bot.send_message(
-                    int(curator['user_id']),
-                    "🎓 *НОВЫЙ СЕМЕСТР!*\n\n"
-                    "Данные прошлого семестра архивированы.\n"
-                    "Пожалуйста, введите новое название вашей группы:\n"
-                    "• Например: B-23, M-22, A-24\n"
-                    "• Формат: Буква-Цифры (B-13)\n\n"
-                    "Просто введите название группы в чат:",
-                    parse_mode='Markdown'
-                )
-                notified_count += 1
-            except Exception as e:
-                logger.error(f"Error notifying curator {curator['user_id']}: {e}")
+        # Сброс групп кураторов отправляется в таблицу одним запросом из пула потоков
+        await aget_users_index()
+        resets = []
+        for curator in active:
+            located = _locate_user_cell(int(curator['user_id']), "group")
+            if located is not None:
+                resets.append(gsh.cell_update("Users", located[0], located[1], ""))
+        if resets:
+            await gsh.abatch_update_cells(resets)
+        invalidate_sheet_cache("Users")
+        
+        # Уведомляем всех кураторов параллельно: семафор ограничивает число
+        # одновременных запросов, общий темп отправки держит AIORateLimiter.
+        # Текст уведомления берется из MESSAGES на языке куратора
+        semaphore = asyncio.Semaphore(BROADCAST_CONCURRENCY)
+        delivered = await asyncio.gather(*(
+            _send_notification(
+                context.bot, int(curator['user_id']),
+                MESSAGES.get(curator['language'], MESSAGES["ru"])["new_semester_notice"], semaphore
+            )
+            for curator in curators
+        ), return_exceptions=True)
+        notified_count = sum(result is True for result in delivered)
         
         await query.edit_message_text(
             f"✅ *Новый семестр запущен!*\n\n"
@@ -852,145 +1720,158 @@ async def confirm_new_semester(update: Update, context: ContextTypes.DEFAULT_TYP
             f"• Уведомлено кураторов: {notified_count}/{len(curators)}\n\n"
             "Все кураторы получили запрос на ввод новых названий групп.",
             parse_mode='Markdown',
-            reply_markup=admin_keyboard(user_data["language"])
+            reply_markup=admin_keyboard(lang)
         )
         
     except Exception as e:
-        logger.error(f"Error starting new semester: {e}")
+        logger.error("Error starting new semester: %s", e)
         await query.edit_message_text(
             "❌ Ошибка при запуске нового семестра",
-            reply_markup=admin_keyboard(user_data["language"])
+            reply_markup=admin_keyboard(lang)
         )
 
-async def admin_stats(update: Update, context: ContextTypes.DEFAULT_TYPE):
+@require_super_admin
+async def admin_stats(update: Update, context: ContextTypes.DEFAULT_TYPE, query):
     """Показать статистику"""
-    query = update.callback_query
-    await query.answer()
-    user_id = query.from_user.id
-    
-    if user_id not in SUPER_ADMINS:
-        await query.edit_message_text("❌ Доступ запрещен")
-        return
-        
-    user_data = get_user_data(user_id)
-    
     try:
-        users = gsh.get_sheet_data("Users")
+        # Лист Users и недостающие листы групп (одним batchGet) загружаются параллельно
+        group_sheets = gsh.sorted_group_sheets()
+        users, curators, rowcounts = await asyncio.gather(
+            aget_cached_sheet_data("Users"), aget_all_curators(), aget_sheet_rowcounts(group_sheets)
+        )
         total_users = len(users) - 1  # minus header
-        curators = get_all_curators()
         active_curators = sum(1 for c in curators if c['group'])
         
-        response = (
+        # Строки собираются в список и склеиваются один раз
+        parts = [
             f"📊 *СТАТИСТИКА БОТА*\n\n"
             f"• Всего пользователей: {total_users}\n"
             f"• Кураторов: {len(curators)}\n"
             f"• Активных кураторов (с группой): {active_curators}\n"
             f"• Всего листов: {len(gsh.sheets)}\n\n"
             f"*Группы с заданиями:*\n"
-        )
-        
-        # Считаем задания по группам
-        group_stats = {}
-        for sheet_name in gsh.sheets:
-            if not sheet_name.endswith('Archive') and sheet_name != 'Users':
-                data = gsh.get_sheet_data(sheet_name)
-                task_count = len(data) - 1  # minus header
-                group_stats[sheet_name] = task_count
+        ]
         
-        for group, count in group_stats.items():
-            response += f"• {group}: {count} заданий\n"
+        # Задания по группам: число строк без заголовка
+        group_stats = {sheet_name: count - 1 for sheet_name, count in rowcounts.items()}
+        # Выводим группы с наибольшим числом заданий, чтобы не превысить лимит длины сообщения
+        top_groups = sorted(group_stats.items(), key=itemgetter(1), reverse=True)[:STATS_MAX_GROUPS]
+        parts.extend(f"• {group}: {count} заданий\n" for group, count in top_groups)
+        if len(group_stats) > STATS_MAX_GROUPS:
+            parts.append(f"… и еще {len(group_stats) - STATS_MAX_GROUPS} групп\n")
             
         if not group_stats:
-            response += "Пока нет активных групп с заданиями"
+            parts.append("Пока нет активных групп с заданиями")
         
-        await query.edit_message_text(response, parse_mode='Markdown')
+        await query.edit_message_text("".join(parts), parse_mode='Markdown')
         
     except Exception as e:
-        logger.error(f"Error getting stats: {e}")
+        logger.error("Error getting stats: %s", e)
         await query.edit_message_text("❌ Ошибка при получении статистики")
 
 # ==================== СИСТЕМА ЗАДАНИЙ ====================
+def split_group_tasks(values, group, now):
+    """Разделить строки листа группы на актуальные задания и прошедшие
+    
+    Возвращает ([(дедлайн, строка, номер строки), ...], [номер прошедшей строки, ...]).
+    Номера строк считаются с 1, заголовок пропускается. Прошедшим считается задание,
+    дедлайн которого уже наступил, или с датой раньше сегодняшней, если перенесенная
+    на следующий год дата (как в convert_to_datetime) дальше окна напоминаний.
+    Так задания на начало января, добавленные в конце декабря, не удаляются.
+    """
+    tasks = []
+    expired_rows = []
+    today = (now.month, now.day)
+    for idx, row in enumerate(values[1:], start=2):
+        # Пропускаем чужие и пустые строки
+        if len(row) < 7 or row[6] != group or not row[0] or not row[4]:
+            continue
+        month_day = _month_day(row[4])
+        if month_day is None:
+            continue
+        deadline = convert_to_datetime(row[5], row[4], now)
+        if deadline is None:
+            continue
+        if deadline <= now:
+            expired_rows.append(idx)
+            continue
+        # Даты раньше сегодняшней в список не попадают; удаляются только те,
+        # что и после переноса на следующий год не попадают в окно напоминаний
+        if month_day < today:
+            if (deadline.date() - now.date()).days > REMINDER_DAYS_AHEAD:
+                expired_rows.append(idx)
+            continue
+        tasks.append((deadline, row, idx))
+    return tasks, expired_rows
+
 async def show_tasks_for_group(query, group, show_delete_buttons=False):
     """Показать задания для группы"""
     try:
-        data = gsh.get_sheet_data(group)[1:]  # Пропускаем заголовок
+        data = await aget_cached_sheet_data(group)
         
-        user_data = get_user_data(query.from_user.id)
-        response = f"📌 Задания для группы {group}:\n\n" if user_data["language"] == "ru" else f"📌 Tasks for group {group}:\n\n"
-        count = 0
-        tasks = []
-
-        for idx, row in enumerate(data, start=2):
-            if len(row) >= 7 and row[6] == group:
-                try:
-                    # Пропускаем пустые строки
-                    if not row[0] or not row[4]:
-                        continue
-                        
-                    # Проверяем что дата актуальная
-                    day, month = map(int, row[4].split('.'))
-                    current_date = datetime.now(MOSCOW_TZ)
-                    
-                    # Если дата уже прошла в этом году, пропускаем
-                    proposed_date = datetime(current_date.year, month, day)
-                    if proposed_date.date() < current_date.date():
-                        continue
-                    
-                    # Проверяем дедлайн
-                    deadline = convert_to_datetime(row[5], row[4])
-                    if deadline and deadline > datetime.now(MOSCOW_TZ):
-                        tasks.append((deadline, row, idx))
-                except Exception as e:
-                    logger.error(f"Ошибка при обработке задания: {e}")
-                    continue
+        user_data = await aget_user_data(query.from_user.id)
+        lang = user_data["language"]
+        is_ru = lang == "ru"
+        # Одно "сейчас" на весь просмотр листа
+        tasks, expired_rows = split_group_tasks(data, group, now_moscow())
 
         tasks.sort(key=lambda x: x[0])
 
+        # Текст собирается в список и склеивается один раз
+        parts = [MESSAGES[lang]["tasks_header"].format(group=html.escape(group))]
         keyboard = []
-        for deadline, row, row_idx in tasks:
-            if deadline > datetime.now(MOSCOW_TZ):
-                count += 1
-                
-                time_display = row[5]
-                book_icon = "📖" if len(row) > 7 and row[7] == "open-book" else "📕"
-                
-                details = ""
-                if len(row) > 8 and row[8] and row[8].strip() and row[8] not in ["не выбраны", "not selected"]:
-                    details = f" | {row[8]}\n"
-                
-                response += (
-                    f"📚 *{row[0]}* — {row[1]} {book_icon} | {row[2]}\n"
-                    f"📅 {row[4]} | 🕒 {time_display} | *{row[3]}* баллов курса\n" 
-                    f"{details}\n"
-                    if user_data["language"] == "ru" else
-                    f"📚 *{row[0]}* — {row[1]} {book_icon} ({row[2]})\n"                   
-                    f"📅 {row[4]} | 🕒 {time_display} | *{row[3]}* course points\n"
-                    f"{details}\n"
-                )
-                
-                if show_delete_buttons:
-                    keyboard.append([InlineKeyboardButton(
-                        f"🗑️ Удалить: {row[0]} ({row[4]})" 
-                        if user_data["language"] == "ru" else 
-                        f"🗑️ Delete: {row[0]} ({row[4]})",
-                        callback_data=f"delete_{group}_{row_idx}"
-                    )])
-
-        if count == 0:
-            response = "ℹ️ Пока нет заданий для вашей группы." if user_data["language"] == "ru" else "ℹ️ No tasks for your group yet."
+        for _, row, row_idx in tasks:
+            book_icon = "📖" if len(row) > 7 and row[7] == "open-book" else "📕"
+            
+            details = ""
+            if len(row) > 8 and row[8].strip() not in _UNSET_DETAILS:
+                details = f" | {html.escape(row[8])}\n"
+            
+            # Все поля листа — свободный текст куратора: экранируем, чтобы не ломать разметку
+            subject, task_type, task_format, max_points, task_date, time_display = map(html.escape, row[:6])
+            parts.append(
+                f"📚 <b>{subject}</b> — {task_type} {book_icon} | {task_format}\n"
+                f"📅 {task_date} | 🕒 {time_display} | <b>{max_points}</b> баллов курса\n" 
+                f"{details}\n"
+                if is_ru else
+                f"📚 <b>{subject}</b> — {task_type} {book_icon} ({task_format})\n"                   
+                f"📅 {task_date} | 🕒 {time_display} | <b>{max_points}</b> course points\n"
+                f"{details}\n"
+            )
+            
+            if show_delete_buttons:
+                keyboard.append([InlineKeyboardButton(
+                    f"🗑️ Удалить: {row[0]} ({row[4]})" 
+                    if is_ru else 
+                    f"🗑️ Delete: {row[0]} ({row[4]})",
+                    callback_data=f"delete_{group}_{row_idx}"
+                )])
+
+        if tasks:
+            response = "".join(parts)
+        else:
+            response = "ℹ️ Пока нет заданий для вашей группы." if is_ru else "ℹ️ No tasks for your group yet."
 
         if show_delete_buttons:
+            # Прошедшие задания удаляются все сразу одним запросом к таблице
+            if expired_rows:
+                keyboard.append([InlineKeyboardButton(
+                    f"🧹 Удалить прошедшие ({len(expired_rows)})"
+                    if is_ru else
+                    f"🧹 Delete past tasks ({len(expired_rows)})",
+                    callback_data=f"prune_{group}"
+                )])
             keyboard.append([InlineKeyboardButton(
-                "↩️ Назад" if user_data["language"] == "ru" else "↩️ Back", 
+                "↩️ Назад" if is_ru else "↩️ Back", 
                 callback_data="back_to_menu")])
             reply_markup = InlineKeyboardMarkup(keyboard)
         else:
-            reply_markup = main_menu_keyboard(user_data["language"], user_data["is_curator"])
+            reply_markup = main_menu_keyboard(lang, user_data["is_curator"])
 
-        await query.edit_message_text(response, parse_mode='Markdown', reply_markup=reply_markup)
+        await query.edit_message_text(response, parse_mode='HTML', reply_markup=reply_markup)
     except Exception as e:
-        logger.error(f"Ошибка при получении заданий: {e}")
-        user_data = get_user_data(query.from_user.id)
+        logger.error("Ошибка при получении заданий: %s", e)
+        user_data = await aget_user_data(query.from_user.id)
         await query.edit_message_text(
             f"⛔ Ошибка при получении заданий: {str(e)}" 
             if user_data["language"] == "ru" else 
@@ -1000,9 +1881,8 @@ async def show_tasks_for_group(query, group, show_delete_buttons=False):
 async def callback_get_data(update: Update, context: ContextTypes.DEFAULT_TYPE):
     """Получить данные о заданиях"""
     query = update.callback_query
-    await query.answer()
     user_id = query.from_user.id
-    user_data = get_user_data(user_id)
+    _, user_data = await asyncio.gather(query.answer(), aget_user_data(user_id))
 
     if user_data["group"]:
         await show_tasks_for_group(query, user_data["group"])
@@ -1015,24 +1895,18 @@ async def callback_select_group(update: Update, context: ContextTypes.DEFAULT_TY
     if query:
         await query.answer()
     
-    user_data = get_user_data(query.from_user.id if query else update.effective_user.id)
-    
-    group_keyboard = [
-        [InlineKeyboardButton("B-11", callback_data="set_group_B-11"),
-         InlineKeyboardButton("B-12", callback_data="set_group_B-12")],
-        [InlineKeyboardButton(
-            "↩️ Назад в меню" if user_data["language"] == "ru" else "↩️ Back to menu", 
-            callback_data="back_to_menu")]
-    ]
+    user_data = await aget_user_data(query.from_user.id if query else update.effective_user.id)
+    lang = user_data["language"]
+    is_ru = lang == "ru"
     
-    text = "👥 Выберите вашу группу:" if user_data["language"] == "ru" else "👥 Select your group:"
+    text = "👥 Выберите вашу группу:" if is_ru else "👥 Select your group:"
     if query:
-        await query.edit_message_text(text, reply_markup=InlineKeyboardMarkup(group_keyboard))
+        await query.edit_message_text(text, reply_markup=group_select_keyboard(lang))
     else:
         await context.bot.send_message(
             update.effective_chat.id,
             text,
-            reply_markup=InlineKeyboardMarkup(group_keyboard)
+            reply_markup=group_select_keyboard(lang)
         )
 
 async def set_user_group(update: Update, context: ContextTypes.DEFAULT_TYPE):
@@ -1040,61 +1914,73 @@ async def set_user_group(update: Update, context: ContextTypes.DEFAULT_TYPE):
     query = update.callback_query
     await query.answer()
     user_id = query.from_user.id
-    group = query.data.replace("set_group_", "")
+    group = query.data.removeprefix("set_group_")
     
-    if update_user_data(user_id, "group", group):
-        user_data = get_user_data(user_id)
+    user_data = await aupdate_user_data(user_id, "group", group)
+    if user_data is not None:
         await query.edit_message_text(
-            f"✅ Ваша группа установлена: {group}" 
-            if user_data["language"] == "ru" else 
-            f"✅ Your group is set: {group}",
+            MESSAGES[user_data["language"]]["group_set"].format(group=group),
             reply_markup=main_menu_keyboard(user_data["language"], user_data["is_curator"]))
         
         if user_data["reminders_enabled"]:
-            await schedule_reminders_for_user(context.application.job_queue, user_id)
+            await schedule_reminders_for_user(context.application.job_queue, user_id, user_data=user_data)
     else:
-        user_data = get_user_data(user_id)
+        user_data = await aget_user_data(user_id)
         await query.edit_message_text(
             "⛔ Произошла ошибка при установке группы." 
             if user_data["language"] == "ru" else 
             "⛔ An error occurred while setting the group.",
             reply_markup=main_menu_keyboard(user_data["language"], user_data["is_curator"]))
 
+def get_task_draft(context):
+    """Черновик задания из user_data (создается пустым, если его еще нет)"""
+    draft = context.user_data.get("task_draft")
+    if draft is None:
+        draft = context.user_data["task_draft"] = TaskDraft()
+    return draft
+
 async def format_task_message(context):
-    task_data = context.user_data.get("task_data", {})
-    user_data = get_user_data(context._user_id) if hasattr(context, '_user_id') else {"language": "ru"}
-    
-    message = "📝 Редактирование задания:\n\n" if user_data["language"] == "ru" else "📝 Editing task:\n\n"
-    message += f"🔹 <b>Предмет:</b> {task_data.get('subject', 'не выбрано' if user_data['language'] == 'ru' else 'not selected')}\n"
-    message += f"🔹 <b>Тип задания:</b> {task_data.get('task_type', 'не выбрано' if user_data['language'] == 'ru' else 'not selected')}\n"
-    message += f"🔹 <b>Макс. баллы:</b> {task_data.get('max_points', 'не выбрано' if user_data['language'] == 'ru' else 'not selected')}\n"
-    message += f"🔹 <b>Дата:</b> {task_data.get('date', 'не выбрана' if user_data['language'] == 'ru' else 'not selected')}\n"
-    
-    time_display = task_data.get('time', 'не выбрано' if user_data['language'] == 'ru' else 'not selected')
-    if time_display == "23:59":
-        time_display = "By schedule" if user_data['language'] == "en" else "По расписанию"
-    elif time_display == "time_schedule":
-        time_display = "By schedule" if user_data['language'] == "en" else "По расписанию"
-    message += f"🔹 <b>Время:</b> {time_display}\n"
-    
-    message += f"🔹 <b>Формат:</b> {task_data.get('format', 'не выбран' if user_data['language'] == 'ru' else 'not selected')}\n"
-    message += f"🔹 <b>Тип книги:</b> {task_data.get('book_type', 'не выбран' if user_data['language'] == 'ru' else 'not selected')}\n"
-    message += f"🔹 <b>Детали:</b> {task_data.get('details', 'не выбраны' if user_data['language'] == 'ru' else 'not selected')}\n\n"
-    message += "Выберите параметр для изменения или сохраните задание:" if user_data['language'] == "ru" else "Select a parameter to change or save the task:"
-    return message
+    draft = get_task_draft(context)
+    user_data = await aget_user_data(context._user_id) if hasattr(context, '_user_id') else {"language": "ru"}
+    messages = MESSAGES[user_data["language"]]
+    
+    # Невыбранные поля показываются подписью на языке пользователя
+    unset = messages["task_unset"]
+    fields = {key: getattr(draft, key) or placeholder for key, placeholder in unset.items()}
+    if fields["time"] in ("23:59", "time_schedule"):
+        fields["time"] = messages["by_schedule"]
+    return messages["task_editing"].format_map(fields)
+
+async def show_task_editor(query, context, lang):
+    """Показать карточку задания в сообщении с нажатой кнопкой
+    
+    Если карточка в этом сообщении уже показана с тем же текстом (например,
+    повторно выбрано то же значение), запрос к Telegram не отправляется.
+    """
+    message = await format_task_message(context)
+    rendered = (query.message.message_id, message)
+    if context.user_data.get("last_rendered") == rendered:
+        return
+    await query.edit_message_text(
+        message,
+        reply_markup=generate_edit_task_keyboard(lang),
+        parse_mode='HTML'
+    )
+    context.user_data["last_rendered"] = rendered
 
 async def callback_add_task(update: Update, context: ContextTypes.DEFAULT_TYPE):
     """Добавить задание"""
     query = update.callback_query
-    await query.answer()
     user_id = query.from_user.id
-    user_data = get_user_data(user_id)
+    _, user_data = await asyncio.gather(query.answer(), aget_user_data(user_id))
+    lang = user_data["language"]
+    is_ru = lang == "ru"
 
     # Проверяем права куратора
     if not user_data.get("is_curator", False):
         await query.edit_message_text(
-            "⛔ У вас нет доступа к добавлению заданий." if user_data["language"] == "ru" else "⛔ You don't have access to add tasks.",
-            reply_markup=main_menu_keyboard(user_data["language"], False))
+            "⛔ У вас нет доступа к добавлению заданий." if is_ru else "⛔ You don't have access to add tasks.",
+            reply_markup=main_menu_keyboard(lang, False))
         return ConversationHandler.END
 
     # Проверяем что куратор установил группу
@@ -1105,268 +1991,144 @@ async def callback_add_task(update: Update, context: ContextTypes.DEFAULT_TYPE):
         )
         return ConversationHandler.END
 
-    context.user_data["task_data"] = {
-        "group": user_data["group"],
-        "subject": "не выбрано" if user_data["language"] == "ru" else "not selected",
-        "task_type": "не выбрано" if user_data["language"] == "ru" else "not selected",
-        "max_points": "не выбрано" if user_data["language"] == "ru" else "not selected",
-        "date": "не выбрана" if user_data["language"] == "ru" else "not selected",
-        "time": "не выбрано" if user_data["language"] == "ru" else "not selected",
-        "format": "не выбран" if user_data["language"] == "ru" else "not selected",
-        "book_type": "не выбран" if user_data["language"] == "ru" else "not selected",
-        "details": "не выбраны" if user_data["language"] == "ru" else "not selected"
-    }
+    # Невыбранные поля храним как None, подписи подставляет format_task_message
+    context.user_data["task_draft"] = TaskDraft(group=user_data["group"])
 
-    message = await format_task_message(context)
-    await query.edit_message_text(
-        message,
-        reply_markup=generate_edit_task_keyboard(user_data["language"]),
-        parse_mode='HTML'
-    )
+    await show_task_editor(query, context, lang)
     return EDITING_TASK
 
+async def edit_task_show_picker(update: Update, context: ContextTypes.DEFAULT_TYPE):
+    """Показать варианты значения для выбранного параметра задания"""
+    query = update.callback_query
+    _, user_data = await asyncio.gather(query.answer(), aget_user_data(query.from_user.id))
+    lang = user_data["language"]
+    await query.edit_message_text(MESSAGES[lang][query.data], reply_markup=_EDIT_PICKERS[query.data](lang))
+    # Карточку в этом сообщении заменил список вариантов
+    context.user_data.pop("last_rendered", None)
+    return EDITING_TASK
+
+async def edit_task_request_input(update: Update, context: ContextTypes.DEFAULT_TYPE):
+    """Запросить ручной ввод значения параметра задания"""
+    query = update.callback_query
+    _, user_data = await asyncio.gather(query.answer(), aget_user_data(query.from_user.id))
+    await query.edit_message_text(MESSAGES[user_data["language"]][query.data])
+    context.user_data.pop("last_rendered", None)
+    context.user_data["waiting_for"] = _EDIT_INPUT_FIELDS[query.data]
+    return WAITING_FOR_INPUT
+
 async def edit_task_parameter(update: Update, context: ContextTypes.DEFAULT_TYPE):
+    """Записать выбранное значение параметра и вернуться к карточке задания"""
     query = update.callback_query
-    await query.answer()
-    user_data = get_user_data(query.from_user.id)
+    _, user_data = await asyncio.gather(query.answer(), aget_user_data(query.from_user.id))
+    lang = user_data["language"]
+    # Черновик задания берется из user_data один раз на нажатие
+    draft = get_task_draft(context)
+    
+    match query.data:
+        case data if data in _EDIT_CHOICE_FIELDS:
+            setattr(draft, _EDIT_CHOICE_FIELDS[data], data)
+        case data if data.startswith("points_"):
+            draft.max_points = data.removeprefix("points_")
+        case data if data.startswith("time_"):
+            time_value = data.removeprefix("time_")
+            if time_value == "schedule":
+                time_value = "23:59"
+            draft.time = time_value
+        case data if _DATE_CB_RE.match(data):
+            draft.date = data
+        # back_to_editing только перерисовывает карточку
+    
+    await show_task_editor(query, context, lang)
+    return EDITING_TASK
+
+async def edit_task_save(update: Update, context: ContextTypes.DEFAULT_TYPE):
+    """Сохранить задание в лист группы"""
+    query = update.callback_query
+    _, user_data = await asyncio.gather(query.answer(), aget_user_data(query.from_user.id))
+    lang = user_data["language"]
+    is_ru = lang == "ru"
+    draft = get_task_draft(context)
     
-    if query.data == "edit_subject":
-        await query.edit_message_text(
-            "✍️ Выберите предмет:" if user_data["language"] == "ru" else "✍️ Select subject:",
-            reply_markup=generate_subject_keyboard(user_data["language"])
-        )
-    elif query.data == "edit_task_type":
-        await query.edit_message_text(
-            "📘 Выберите тип задания:" if user_data["language"] == "ru" else "📘 Select task type:",
-            reply_markup=generate_task_type_keyboard(user_data["language"])
-        )
-    elif query.data == "edit_max_points":
-        await query.edit_message_text(
-            "💯 Выберите количество баллов от курса:" if user_data["language"] == "ru" else "💯 Select course points:",
-            reply_markup=generate_points_keyboard(user_data["language"])
-        )
-    elif query.data == "edit_date":
-        await query.edit_message_text(
-            "🗓️ Выберите дату:" if user_data["language"] == "ru" else "🗓️ Select date:",
-            reply_markup=generate_date_buttons(user_data["language"])
-        )
-    elif query.data == "edit_time":
-        await query.edit_message_text(
-            "⏰ Выберите время:" if user_data["language"] == "ru" else "⏰ Select time:",
-            reply_markup=generate_time_keyboard(user_data["language"])
-        )
-    elif query.data == "edit_format":
-        await query.edit_message_text(
-            "📍 Выберите формат:" if user_data["language"] == "ru" else "📍 Select format:",
-            reply_markup=generate_format_keyboard(user_data["language"])
-        )
-    elif query.data == "edit_details":
-        await query.edit_message_text(
-            "📝 Выберите детали:" if user_data["language"] == "ru" else "📝 Select details:",
-            reply_markup=generate_details_keyboard(user_data["language"])
-        )
-    elif query.data == "back_to_editing":
-        message = await format_task_message(context)
-        await query.edit_message_text(
-            message,
-            reply_markup=generate_edit_task_keyboard(user_data["language"]),
-            parse_mode='HTML'
-        )
-    elif query.data in ["open-book", "closed-book"]:
-        context.user_data["task_data"]["book_type"] = query.data
-        message = await format_task_message(context)
-        await query.edit_message_text(
-            message,
-            reply_markup=generate_edit_task_keyboard(user_data["language"]),
-            parse_mode='HTML'
-        )
-    elif query.data in ["Calculators allowed", "Notes allowed", "Phones allowed"]:
-        context.user_data["task_data"]["details"] = query.data
-        message = await format_task_message(context)
-        await query.edit_message_text(
-            message,
-            reply_markup=generate_edit_task_keyboard(user_data["language"]),
-            parse_mode='HTML'
-        )
-    elif query.data == "other_details":
-        await query.edit_message_text("📝 Введите детали:" if user_data["language"] == "ru" else "📝 Enter details:")
-        context.user_data["waiting_for"] = "details"
-        return WAITING_FOR_INPUT
+    if any(getattr(draft, key) is None for key in _REQUIRED_KEYS):
+        await query.answer(
+            MESSAGES[lang]["task_fill_required"],
+            show_alert=True)
+        return EDITING_TASK
+    
+    group = draft.group
+    
+    try:
+        row_data = [value or "" for value in astuple(draft)]
         
-    elif query.data.startswith(("Entrepreneurship", "Financial Analysis", "International Economics", 
-                          "Law", "Marketing", "Statistics")):            
-        context.user_data["task_data"]["subject"] = query.data
-        message = await format_task_message(context)
-        await query.edit_message_text(
-            message,
-            reply_markup=generate_edit_task_keyboard(user_data["language"]),
-            parse_mode='HTML'
-        )
-    elif query.data.startswith(("Test", "HW", "MidTerm", "FinalTest")):
-        context.user_data["task_data"]["task_type"] = query.data
-        message = await format_task_message(context)
-        await query.edit_message_text(
-            message,
-            reply_markup=generate_edit_task_keyboard(user_data["language"]),
-            parse_mode='HTML'
-        )
-    elif query.data.startswith("points_"):
-        points_value = query.data[7:]
-        context.user_data["task_data"]["max_points"] = points_value
-        message = await format_task_message(context)
-        await query.edit_message_text(
-            message,
-            reply_markup=generate_edit_task_keyboard(user_data["language"]),
-            parse_mode='HTML'
-        )
-    elif len(query.data.split('.')) == 2 and query.data.count('.') == 1:
-        context.user_data["task_data"]["date"] = query.data
-        message = await format_task_message(context)
-        await query.edit_message_text(
-            message,
-            reply_markup=generate_edit_task_keyboard(user_data["language"]),
-            parse_mode='HTML'
-        )
-    elif query.data.startswith("time_"):
-        time_value = query.data[5:]
-        if time_value == "schedule":
-            time_value = "23:59"
-        context.user_data["task_data"]["time"] = time_value
-        message = await format_task_message(context)
-        await query.edit_message_text(
-            message,
-            reply_markup=generate_edit_task_keyboard(user_data["language"]),
-            parse_mode='HTML'
-        )
-    elif query.data in ["Online", "Offline"]:
-        context.user_data["task_data"]["format"] = query.data
-        message = await format_task_message(context)
-        await query.edit_message_text(
-            message,
-            reply_markup=generate_edit_task_keyboard(user_data["language"]),
-            parse_mode='HTML'
-        )
-    elif query.data == "other_subject":
-        await query.edit_message_text("✍️ Введите название предмета:" if user_data["language"] == "ru" else "✍️ Enter subject name:")
-        context.user_data["waiting_for"] = "subject"
-        return WAITING_FOR_INPUT
-    elif query.data == "other_task_type":
-        await query.edit_message_text("📘 Введите тип задания:" if user_data["language"] == "ru" else "📘 Enter task type:")
-        context.user_data["waiting_for"] = "task_type"
-        return WAITING_FOR_INPUT
-    elif query.data == "other_max_points":
-        await query.edit_message_text("💯 Введите количество баллов:" if user_data["language"] == "ru" else "💯 Enter points:")
-        context.user_data["waiting_for"] = "max_points"
-        return WAITING_FOR_INPUT
-    elif query.data == "custom_date":
-        await query.edit_message_text("🗓️ Введите дату в формате ДД.ММ (например, 15.12):" if user_data["language"] == "ru" else "🗓️ Enter date in DD.MM format (e.g., 15.12):")
-        context.user_data["waiting_for"] = "date"
-        return WAITING_FOR_INPUT
-    elif query.data == "save_task":
-        task_data = context.user_data.get("task_data", {})
-        if (task_data["subject"] == ("не выбрано" if user_data["language"] == "ru" else "not selected") or 
-            task_data["task_type"] == ("не выбрано" if user_data["language"] == "ru" else "not selected") or 
-            task_data["max_points"] == ("не выбрано" if user_data["language"] == "ru" else "not selected") or 
-            task_data["date"] == ("не выбрана" if user_data["language"] == "ru" else "not selected") or 
-            task_data["time"] == ("не выбрано" if user_data["language"] == "ru" else "not selected") or 
-            task_data["format"] == ("не выбран" if user_data["language"] == "ru" else "not selected") or 
-            task_data["book_type"] == ("не выбран" if user_data["language"] == "ru" else "not selected")):
-            
-            await query.answer(
-                "⚠️ Заполните все обязательные поля перед сохранением!" if user_data["language"] == "ru" else "⚠️ Fill all required fields before saving!",
-                show_alert=True)
-            return EDITING_TASK
+        await append_row_batched(group, row_data)
+        context.user_data.clear()
         
-        group = task_data["group"]
+        # Напоминания группы пересобираются в фоне, не задерживая ответ
+        context.application.create_task(
+            refresh_reminders_for_group(context.application.job_queue, group)
+        )
         
-        try:
-            row_data = [
-                task_data["subject"],
-                task_data["task_type"],
-                task_data["format"],
-                task_data["max_points"],
-                task_data["date"],
-                task_data["time"],
-                group,
-                task_data["book_type"],
-                task_data.get("details", "")
-            ]
-            
-            gsh.update_sheet(group, row_data)
-            context.user_data.clear()
-            
-            # Обновляем напоминания для всех пользователей группы
-            await refresh_reminders_for_group(context.application.job_queue, group)
-            
-            await query.edit_message_text(
-                "✅ Задание успешно добавлено!" if user_data["language"] == "ru" else "✅ Task added successfully!",
-                reply_markup=main_menu_keyboard(user_data["language"], user_data["is_curator"]))
-        except Exception as e:
-            logger.error(f"Ошибка при сохранении задания: {e}")
-            await query.edit_message_text(
-                f"⛔ Произошла ошибка при сохранении: {str(e)}" if user_data["language"] == "ru" else f"⛔ Error saving: {str(e)}",
-                reply_markup=main_menu_keyboard(user_data["language"], user_data["is_curator"]))
-        return ConversationHandler.END
-    elif query.data == "cancel_task":
-        context.user_data.clear()
         await query.edit_message_text(
-            "🚫 Добавление задания отменено." if user_data["language"] == "ru" else "🚫 Task addition canceled.",
-            reply_markup=main_menu_keyboard(user_data["language"], user_data["is_curator"]))
-        return ConversationHandler.END
-    
-    return EDITING_TASK
+            MESSAGES[lang]["task_added"],
+            reply_markup=main_menu_keyboard(lang, user_data["is_curator"]))
+    except Exception as e:
+        logger.error("Ошибка при сохранении задания: %s", e)
+        await query.edit_message_text(
+            f"⛔ Произошла ошибка при сохранении: {str(e)}" if is_ru else f"⛔ Error saving: {str(e)}",
+            reply_markup=main_menu_keyboard(lang, user_data["is_curator"]))
+    return ConversationHandler.END
+
+async def edit_task_cancel(update: Update, context: ContextTypes.DEFAULT_TYPE):
+    """Отменить добавление задания"""
+    query = update.callback_query
+    _, user_data = await asyncio.gather(query.answer(), aget_user_data(query.from_user.id))
+    lang = user_data["language"]
+    context.user_data.clear()
+    await query.edit_message_text(
+        MESSAGES[lang]["task_canceled"],
+        reply_markup=main_menu_keyboard(lang, user_data["is_curator"]))
+    return ConversationHandler.END
 
 async def handle_user_input(update: Update, context: ContextTypes.DEFAULT_TYPE):
     user_input = update.message.text
     waiting_for = context.user_data.get("waiting_for")
-    user_data = get_user_data(update.effective_user.id)
-    
-    if waiting_for == "subject":
-        context.user_data["task_data"]["subject"] = user_input
-    elif waiting_for == "task_type":
-        context.user_data["task_data"]["task_type"] = user_input
-    elif waiting_for == "max_points":
-        context.user_data["task_data"]["max_points"] = user_input
-    elif waiting_for == "date":
-        try:
-            day, month = user_input.split('.')
-            if len(day) == 2 and len(month) == 2 and 1 <= int(month) <= 12 and 1 <= int(day) <= 31:
-                context.user_data["task_data"]["date"] = user_input
-            else:
-                await update.message.reply_text(
-                    "⚠️ Неверный формат даты. Введите дату в формате ДД.ММ (например, 15.12)" if user_data["language"] == "ru" else 
-                    "⚠️ Wrong date format. Enter date in DD.MM format (e.g., 15.12)")
-                return WAITING_FOR_INPUT
-        except:
-            await update.message.reply_text(
-                "⚠️ Неверный формат даты. Введите дату в формате ДД.ММ (например, 15.12)" if user_data["language"] == "ru" else 
-                "⚠️ Wrong date format. Enter date in DD.MM format (e.g., 15.12)")
-            return WAITING_FOR_INPUT
-    elif waiting_for == "details":
-        context.user_data["task_data"]["details"] = user_input
+    user_data = await aget_user_data(update.effective_user.id)
+    lang = user_data["language"]
+    is_ru = lang == "ru"
+    
+    # Дата проверяется одним совпадением с готовым шаблоном ДД.ММ
+    if waiting_for == "date" and not _DATE_INPUT_RE.match(user_input):
+        await update.message.reply_text(
+            "⚠️ Неверный формат даты. Введите дату в формате ДД.ММ (например, 15.12)" if is_ru else 
+            "⚠️ Wrong date format. Enter date in DD.MM format (e.g., 15.12)")
+        return WAITING_FOR_INPUT
+    if waiting_for in _EDIT_INPUT_TARGETS:
+        setattr(get_task_draft(context), waiting_for, user_input)
     
     del context.user_data["waiting_for"]
     
     message = await format_task_message(context)
-    await update.message.reply_text(
+    sent = await update.message.reply_text(
         message,
-        reply_markup=generate_edit_task_keyboard(user_data["language"]),
+        reply_markup=generate_edit_task_keyboard(lang),
         parse_mode='HTML'
     )
+    context.user_data["last_rendered"] = (sent.message_id, message)
     return EDITING_TASK
 
 async def callback_delete_task(update: Update, context: ContextTypes.DEFAULT_TYPE):
     """Удалить задание"""
     query = update.callback_query
-    await query.answer()
     user_id = query.from_user.id
-    user_data = get_user_data(user_id)
+    _, user_data = await asyncio.gather(query.answer(), aget_user_data(user_id))
+    lang = user_data["language"]
+    is_ru = lang == "ru"
 
     # Проверяем права куратора
     if not user_data.get("is_curator", False):
         await query.edit_message_text(
-            "⛔ У вас нет доступа к удалению заданий." if user_data["language"] == "ru" else "⛔ You don't have access to delete tasks.",
-            reply_markup=main_menu_keyboard(user_data["language"], False))
+            "⛔ У вас нет доступа к удалению заданий." if is_ru else "⛔ You don't have access to delete tasks.",
+            reply_markup=main_menu_keyboard(lang, False))
         return ConversationHandler.END
 
     # Проверяем что куратор установил группу
@@ -1382,285 +2144,365 @@ async def callback_delete_task(update: Update, context: ContextTypes.DEFAULT_TYP
 
 async def handle_task_deletion(update: Update, context: ContextTypes.DEFAULT_TYPE):
     query = update.callback_query
-    await query.answer()
-    user_data = get_user_data(query.from_user.id)
+    _, user_data = await asyncio.gather(query.answer(), aget_user_data(query.from_user.id))
+    lang = user_data["language"]
+    is_ru = lang == "ru"
     
     if query.data == "back_to_menu":
         await callback_back_to_menu(update, context)
         return ConversationHandler.END
     
-    if query.data.startswith("delete_"):
+    match = _PRUNE_CB_RE.match(query.data)
+    if match:
+        group = match.group(1)
+        try:
+            # Читаем лист напрямую: номера строк должны совпадать с таблицей
+            all_values = await gsh.aget_sheet_data(group)
+            _, expired_rows = split_group_tasks(all_values, group, now_moscow())
+            await gsh.adelete_row_indices(group, expired_rows)
+            if expired_rows:
+                invalidate_sheet_cache(group)
+                # Номера строк сдвинулись: напоминания группы пересобираются в фоне
+                context.application.create_task(
+                    refresh_reminders_for_group(context.application.job_queue, group)
+                )
+            await query.edit_message_text(
+                f"✅ Удалено прошедших заданий: {len(expired_rows)}"
+                if is_ru else
+                f"✅ Past tasks deleted: {len(expired_rows)}",
+                reply_markup=main_menu_keyboard(lang, user_data["is_curator"]))
+        except Exception as e:
+            logger.error("Ошибка при удалении прошедших заданий: %s", e)
+            await query.edit_message_text(
+                f"⛔ Ошибка при удалении: {str(e)}" if is_ru else f"⛔ Error deleting: {str(e)}",
+                reply_markup=main_menu_keyboard(lang, user_data["is_curator"]))
+        return ConversationHandler.END
+    
+    match = _DELETE_CB_RE.match(query.data)
+    if match:
         try:
-            _, group, row_idx = query.data.split("_")
-            row_idx = int(row_idx)
+            group, row_idx = match.group(1), int(match.group(2))
             
-            all_values = gsh.get_sheet_data(group)
+            # Читаем лист напрямую: индекс строки должен совпадать с таблицей
+            all_values = await gsh.aget_sheet_data(group)
             if row_idx <= len(all_values):
-                gsh.sheets[group].delete_rows(row_idx)
+                await gsh.adelete_rows(group, row_idx)
+                invalidate_sheet_cache(group)
                 
                 await query.edit_message_text(
-                    "✅ Задание успешно удалено!" if user_data["language"] == "ru" else "✅ Task deleted successfully!",
-                    reply_markup=main_menu_keyboard(user_data["language"], user_data["is_curator"]))
+                    "✅ Задание успешно удалено!" if is_ru else "✅ Task deleted successfully!",
+                    reply_markup=main_menu_keyboard(lang, user_data["is_curator"]))
                 
-                # Обновляем напоминания для всех пользователей группы
-                await refresh_reminders_for_group(context.application.job_queue, group)
+                # Напоминания группы пересобираются в фоне, не задерживая ответ
+                context.application.create_task(
+                    refresh_reminders_for_group(context.application.job_queue, group)
+                )
             else:
                 await query.edit_message_text(
-                    "⛔ Задание уже было удалено" if user_data["language"] == "ru" else "⛔ Task was already deleted",
-                    reply_markup=main_menu_keyboard(user_data["language"], user_data["is_curator"]))
+                    "⛔ Задание уже было удалено" if is_ru else "⛔ Task was already deleted",
+                    reply_markup=main_menu_keyboard(lang, user_data["is_curator"]))
         except Exception as e:
-            logger.error(f"Ошибка при удалении задания: {e}")
+            logger.error("Ошибка при удалении задания: %s", e)
             await query.edit_message_text(
-                f"⛔ Ошибка при удалении: {str(e)}" if user_data["language"] == "ru" else f"⛔ Error deleting: {str(e)}",
-                reply_markup=main_menu_keyboard(user_data["language"], user_data["is_curator"]))
+                f"⛔ Ошибка при удалении: {str(e)}" if is_ru else f"⛔ Error deleting: {str(e)}",
+                reply_markup=main_menu_keyboard(lang, user_data["is_curator"]))
     
     return ConversationHandler.END
 
 # ==================== СИСТЕМА НАПОМИНАНИЙ ====================
 async def callback_reminder_settings(update: Update, context: ContextTypes.DEFAULT_TYPE):
     query = update.callback_query
-    await query.answer()
-    user_data = get_user_data(query.from_user.id)
+    _, user_data = await asyncio.gather(query.answer(), aget_user_data(query.from_user.id))
+    lang = user_data["language"]
+    is_ru = lang == "ru"
     
     try:
-        keyboard = [
-            [InlineKeyboardButton(
-                "🔔 Напоминания: Вкл" if user_data["reminders_enabled"] else "🔔 Напоминания: Выкл",
-                callback_data="toggle_reminders")],
-            [InlineKeyboardButton(
-                "↩️ Назад в меню" if user_data["language"] == "ru" else "↩️ Back to menu",
-                callback_data="back_to_menu")]
-        ]
-        
         await query.edit_message_text(
-            f"🔔 Настройки напоминаний:\n\n"
-            f"Напоминания приходят каждый день в {REMINDER_TIME} по МСК за:\n"
-            f"10, 9, 8, ..., 1 день и в день задания." if user_data["language"] == "ru" else 
-            f"🔔 Reminder settings:\n\n"
-            f"Reminders are sent daily at {REMINDER_TIME} MSK for:\n"
-            f"10, 9, 8, ..., 1 days before and on the task day.",
-            reply_markup=InlineKeyboardMarkup(keyboard))
+            MESSAGES[lang]["reminder_settings"],
+            reply_markup=reminder_settings_keyboard(lang, user_data["reminders_enabled"]))
     except Exception as e:
-        logger.error(f"Ошибка в callback_reminder_settings: {e}")
+        logger.error("Ошибка в callback_reminder_settings: %s", e)
         await query.edit_message_text(
-            "⛔ Произошла ошибка при получении настроек." if user_data["language"] == "ru" else "⛔ Error getting settings.",
-            reply_markup=main_menu_keyboard(user_data["language"], user_data["is_curator"]))
+            "⛔ Произошла ошибка при получении настроек." if is_ru else "⛔ Error getting settings.",
+            reply_markup=main_menu_keyboard(lang, user_data["is_curator"]))
 
 async def toggle_reminders(update: Update, context: ContextTypes.DEFAULT_TYPE):
     query = update.callback_query
-    await query.answer()
     user_id = query.from_user.id
-    user_data = get_user_data(user_id)
+    _, user_data = await asyncio.gather(query.answer(), aget_user_data(user_id))
     
     try:
         new_state = not user_data["reminders_enabled"]
-        if update_user_data(user_id, "reminders_enabled", new_state):
-            user_data["reminders_enabled"] = new_state
+        updated = await aupdate_user_data(user_id, "reminders_enabled", new_state)
+        if updated is not None:
+            user_data = updated
         
-        await schedule_reminders_for_user(context.application.job_queue, user_id)
+        await schedule_reminders_for_user(context.application.job_queue, user_id, user_data=user_data)
         
         await query.edit_message_text(
-            f"✅ Напоминания {'включены' if new_state else 'выключены'}!" if user_data["language"] == "ru" else f"✅ Reminders {'enabled' if new_state else 'disabled'}!",
+            MESSAGES[user_data["language"]]["reminders_on" if new_state else "reminders_off"],
             reply_markup=main_menu_keyboard(user_data["language"], user_data["is_curator"]))
     except Exception as e:
-        logger.error(f"Ошибка в toggle_reminders: {e}")
+        logger.error("Ошибка в toggle_reminders: %s", e)
         await query.edit_message_text(
             "⛔ Произошла ошибка при изменении настроек." if user_data["language"] == "ru" else "⛔ Error changing settings.",
             reply_markup=main_menu_keyboard(user_data["language"], user_data["is_curator"]))
 
-async def schedule_reminders_for_user(job_queue: JobQueue, user_id: int):
-    """Запланировать напоминания для пользователя"""
+async def build_group_reminder_tasks(group, now):
+    """Задания группы для напоминаний (от сегодня до REMINDER_DAYS_AHEAD дней), отсортированные по days_left
+    
+    Список одинаков для всех пользователей группы, поэтому строится один раз на группу.
+    """
+    data = (await aget_cached_sheet_data(group))[1:]  # Пропускаем заголовок
+    today = now.date()
+    today_month_day = (today.month, today.day)
+    tasks_for_reminder = []
+    
+    # Отбираем строки группы с заполненными предметом и датой
+    candidate_rows = [r for r in data if len(r) >= 7 and r[6] == group and r[0] and r[4]]
+    
+    for row in candidate_rows:
+        try:
+            # Для days_left нужна только дата: время не разбираем и datetime с
+            # часовым поясом не строим. Прошедшая в этом году дата — следующий год
+            month_day = _month_day(row[4])
+            if month_day is None:
+                continue
+            days_left = (date(today.year + (month_day < today_month_day), *month_day) - today).days
+            if days_left <= REMINDER_DAYS_AHEAD:
+                tasks_for_reminder.append({
+                    'subject': row[0],
+                    'task_type': row[1],
+                    'date': row[4],
+                    'time': row[5],
+                    'days_left': days_left,
+                    'max_points': row[3],
+                    'format': row[2],
+                    'book_type': row[7] if len(row) > 7 else "",
+                    'details': row[8] if len(row) > 8 else ""
+                })
+        except Exception as e:
+            logger.error("Ошибка обработки строки %s: %s", row, e)
+
+    tasks_for_reminder.sort(key=lambda x: x['days_left'])
+    return tasks_for_reminder
+
+@lru_cache(maxsize=1)
+def _next_reminder_at(now):
+    """Ближайший запуск рассылки в REMINDER_TIME по МСК
+    
+    При массовом планировании все пользователи получают одно и то же now,
+    поэтому время считается один раз на проход.
+    """
+    next_reminder = datetime.combine(now.date(), _REMINDER_TIME_OBJ, tzinfo=MOSCOW_TZ)
+    if now.time() > _REMINDER_TIME_OBJ:
+        next_reminder += timedelta(days=1)
+    return next_reminder
+
+async def schedule_reminders_for_user(job_queue: JobQueue, user_id: int, now=None, group_tasks=None,
+                                      user_data=None):
+    """Запланировать напоминания для пользователя
+    
+    group_tasks — общий словарь {группа: задания} на время одного обновления,
+    чтобы лист группы разбирался один раз, а не для каждого пользователя.
+    user_data — уже известные group/reminders_enabled из общего снимка листа Users.
+    """
     try:
-        logger.info(f"Scheduling reminders for user {user_id}")
+        logger.info("Scheduling reminders for user %s", user_id)
         
         # Удаление старых напоминаний
-        for job in job_queue.jobs():
-            if job.name and str(user_id) in job.name:
-                job.schedule_removal()
+        for job in job_queue.get_jobs_by_name(f"daily_reminder_{user_id}"):
+            job.schedule_removal()
 
-        user_data = get_user_data(user_id)
+        if user_data is None:
+            user_data = await aget_user_data(user_id)
         if not user_data["reminders_enabled"] or not user_data["group"]:
             return
 
-        data = gsh.get_sheet_data(user_data["group"])[1:]  # Пропускаем заголовок
-        now = datetime.now(MOSCOW_TZ)
-        today = now.date()
-        tasks_for_reminder = []
-        
-        for row in data:
-            if len(row) >= 7 and row[6] == user_data["group"]:
-                try:
-                    # Пропускаем пустые строки
-                    if not row[0] or not row[4]:
-                        continue
-                        
-                    deadline = convert_to_datetime(row[5], row[4])
-                    if not deadline:
-                        continue
-                        
-                    days_left = (deadline.date() - today).days
-                    if 0 <= days_left <= 10:
-                        tasks_for_reminder.append({
-                            'subject': row[0],
-                            'task_type': row[1],
-                            'date': row[4],
-                            'time': row[5],
-                            'days_left': days_left,
-                            'max_points': row[3],
-                            'format': row[2],
-                            'book_type': row[7] if len(row) > 7 else "",
-                            'details': row[8] if len(row) > 8 else ""
-                        })
-                except Exception as e:
-                    logger.error(f"Ошибка обработки строки {row}: {e}")
+        if now is None:
+            now = datetime.now(MOSCOW_TZ)
+        group = user_data["group"]
+        if group_tasks is None:
+            group_tasks = {}
+        tasks_for_reminder = group_tasks.get(group)
+        if tasks_for_reminder is None:
+            tasks_for_reminder = group_tasks[group] = await build_group_reminder_tasks(group, now)
 
         if tasks_for_reminder:
-            tasks_for_reminder.sort(key=lambda x: x['days_left'])
-            
-            # Планирование на REMINDER_TIME по МСК
-            reminder_time = datetime.strptime(REMINDER_TIME, "%H:%M").time()
-            next_reminder = datetime.combine(datetime.now().date(), reminder_time)
-            
-            if datetime.now().time() > reminder_time:
-                next_reminder += timedelta(days=1)
-            
-            next_reminder = MOSCOW_TZ.localize(next_reminder)
-            
             job_queue.run_repeating(
                 send_daily_reminder_callback,
                 interval=timedelta(days=1),
-                first=next_reminder,
+                first=_next_reminder_at(now),
                 chat_id=user_id,
                 data={'tasks': tasks_for_reminder},
                 name=f"daily_reminder_{user_id}"
             )
-            logger.info(f"Scheduled reminders for user {user_id} at {REMINDER_TIME}")
+            logger.info("Scheduled reminders for user %s at %s", user_id, REMINDER_TIME)
 
     except Exception as e:
-        logger.error(f"Error in schedule_reminders_for_user: {e}")
+        logger.error("Error in schedule_reminders_for_user: %s", e)
 
 async def send_daily_reminder_callback(context: ContextTypes.DEFAULT_TYPE):
     """Колбэк для ежедневного напоминания"""
     await send_daily_reminder(context, context.job.chat_id, context.job.data['tasks'])
 
-async def send_daily_reminder(context: ContextTypes.DEFAULT_TYPE, user_id: int, tasks: list):
-    """Отправить ежедневное напоминание"""
-    if not tasks:
-        return
-    
-    user_data = get_user_data(user_id)
+# Готовые тексты напоминаний: {(id списка заданий, язык): (список заданий, текст)}
+_reminder_texts = {}
+
+def render_daily_reminder(tasks: list, lang: str) -> str:
+    """Текст ежедневного напоминания для списка заданий группы
     
-    # Группируем задачи по дням до дедлайна
-    tasks_by_days = {}
-    for task in tasks:
-        if task['days_left'] not in tasks_by_days:
-            tasks_by_days[task['days_left']] = []
-        tasks_by_days[task['days_left']].append(task)
+    Список заданий общий для всех пользователей группы, поэтому текст
+    собирается один раз на язык и переиспользуется для всей группы.
+    """
+    key = (id(tasks), lang)
+    cached = _reminder_texts.get(key)
+    if cached is not None and cached[0] is tasks:
+        return cached[1]
     
-    # Сортируем дни по возрастанию
-    sorted_days = sorted(tasks_by_days.keys())
+    # Тексты и шаблон строки задания выбираются один раз на сообщение
+    line_fmt = _RU_TASK_FMT if lang == "ru" else _EN_TASK_FMT
+    day_headers = _REMINDER_DAY_HEADERS[lang]
     
     # Создаем сообщение
-    message = "🔔 *ЕЖЕДНЕВНОЕ НАПОМИНАНИЕ*\n\n" if user_data["language"] == "ru" else "🔔 *DAILY TASKS REMINDER*\n\n"
+    parts = [MESSAGES[lang]["reminder_header"]]
     
-    for days_left in sorted_days:
-        if days_left == 0:
-            day_header = "\n*СЕГОДНЯ*" if user_data["language"] == "ru" else "\n*TODAY*"
-        elif days_left == 1:
-            day_header = "\n*ЗАВТРА*" if user_data["language"] == "ru" else "\n*TOMORROW*"
-        else:
-            day_header = f"\n*ЧЕРЕЗ {days_left} ДНЕЙ*" if user_data["language"] == "ru" else f"\n*IN {days_left} DAYS*"
+    # Задачи уже отсортированы по days_left в build_group_reminder_tasks
+    for days_left, day_tasks in groupby(tasks, key=itemgetter('days_left')):
+        parts.append(day_headers[days_left])
         
-        message += f"{day_header}\n"
-        
-        for task in tasks_by_days[days_left]:
-            # Просто показываем время как есть (без года)
-            time_display = task['time']
-                
+        for task in day_tasks:
             book_icon = "📖" if task.get('book_type') == "open-book" else "📕"
             
             # Формируем строку с деталями (только если детали есть и они не "не выбраны")
             details = ""
-            if (task.get('details') and 
-                task['details'].strip() and 
-                task['details'] not in ["не выбраны", "not selected", ""]):
-                details = f" | {task['details']}\n"
+            if task.get('details', "").strip() not in _UNSET_DETAILS:
+                details = f" | {html.escape(task['details'])}\n"
             
-            message += (
-                f"{book_icon} *{task['subject']}* — {task['task_type']} | {task['format']}\n"
-                f"📅 {task['date']} | 🕒 {time_display} | *{task['max_points']}* баллов курса\n" 
-                f"{details}"  # Детали только если есть
-                if user_data["language"] == "ru" else
-                f"{book_icon} *{task['subject']}* — {task['task_type']} ({task['format']})\n"                   
-                f"📅 {task['date']} | 🕒 {time_display} | *{task['max_points']}* course points\n"
-                f"{details}"  # Детали только если есть
-            )
+            # Время показываем как есть (без года), детали только если есть;
+            # текст из листа экранируется для parse_mode='HTML'
+            fields = {key: html.escape(task[key]) for key in _REMINDER_TEXT_FIELDS}
+            parts.append(line_fmt.format_map(ChainMap({'book_icon': book_icon, 'details': details}, fields)))
+    
+    message = "".join(parts)
+    # Список заданий хранится вместе с текстом, чтобы его id не переиспользовался
+    _reminder_texts[key] = (tasks, message)
+    return message
+
+async def send_daily_reminder(context: ContextTypes.DEFAULT_TYPE, user_id: int, tasks: list):
+    """Отправить ежедневное напоминание"""
+    if not tasks:
+        return
+    
+    user_data = await aget_user_data(user_id)
+    message = render_daily_reminder(tasks, user_data["language"])
     
     try:
         await context.bot.send_message(
             chat_id=user_id,
             text=message,
-            parse_mode='Markdown'
+            parse_mode='HTML'
         )
-        logger.info(f"Sent daily reminder to user {user_id}")
+        logger.info("Sent daily reminder to user %s", user_id)
     except Exception as e:
-        logger.error(f"Ошибка при отправке напоминания пользователю {user_id}: {e}")
+        logger.error("Ошибка при отправке напоминания пользователю %s: %s", user_id, e)
 
 async def refresh_reminders_for_group(job_queue: JobQueue, group: str):
     """Обновить напоминания для всех пользователей группы"""
     try:
-        users = gsh.get_sheet_data("Users")
-        for row in users[1:]:
-            if len(row) > 1 and row[1] == group and len(row) > 2 and row[2].lower() == 'true':
-                user_id = int(row[0])
-                await schedule_reminders_for_user(job_queue, user_id)
-        logger.info(f"Refreshed reminders for group {group}")
+        now = datetime.now(MOSCOW_TZ)
+        # Лист группы разбирается один раз, список заданий общий для всех ее пользователей
+        group_tasks = {group: await build_group_reminder_tasks(group, now)}
+        # В индексе только пользователи группы с включенными напоминаниями
+        group_user_data = {"group": group, "reminders_enabled": True}
+        user_ids = list(await aget_group_user_ids(group))
+        await asyncio.gather(*(
+            schedule_reminders_for_user(job_queue, user_id, now, group_tasks, group_user_data)
+            for user_id in user_ids
+        ))
+        logger.info("Refreshed reminders for group %s", group)
     except Exception as e:
-        logger.error(f"Ошибка в refresh_reminders_for_group: {e}")
+        logger.error("Ошибка в refresh_reminders_for_group: %s", e)
 
 async def check_reminders_now(context: ContextTypes.DEFAULT_TYPE):
     """Проверить и отправить напоминания прямо сейчас"""
     try:
-        users = gsh.get_sheet_data("Users")
-        for row in users[1:]:
-            if len(row) > 2 and row[2].lower() == 'true':
-                user_id = int(row[0])
-                await schedule_reminders_for_user(context.application.job_queue, user_id)
+        users = await aget_cached_sheet_data("Users")
+        # Периодическая проверка заодно пересобирает индекс групп
+        _rebuild_group_index(users)
+        # Листы всех групп с напоминаниями загружаем одним запросом
+        await awarm_sheet_cache(_group_to_users.keys())
+        now = datetime.now(MOSCOW_TZ)
+        # Списки заданий пересобираются целиком, старые тексты напоминаний больше не нужны
+        _reminder_texts.clear()
+        # Задания всех групп готовим заранее, чтобы параллельные вызовы не разбирали лист повторно
+        groups = list(_group_to_users)
+        group_tasks = dict(zip(groups, await asyncio.gather(
+            *(build_group_reminder_tasks(group, now) for group in groups)
+        )))
+        # Пользователи с включенными напоминаниями берутся из индекса, без повторного разбора строк
+        job_queue = context.application.job_queue
+        # Напоминания тех, кто выпал из индекса (сброшена группа), снимаем отдельно
+        for job in job_queue.jobs():
+            if job.name.startswith("daily_reminder_") and job.chat_id not in _user_to_group:
+                job.schedule_removal()
+        await asyncio.gather(*(
+            schedule_reminders_for_user(job_queue, user_id, now, group_tasks,
+                                        {"group": group, "reminders_enabled": True})
+            for user_id, group in _user_to_group.items()
+        ))
         logger.info("Checked reminders for all users")
     except Exception as e:
-        logger.error(f"Ошибка в check_reminders_now: {e}")
+        logger.error("Ошибка в check_reminders_now: %s", e)
+
+def _next_tick_delay(now):
+    """Секунд до следующего тика: незадолго до ближайшей рассылки напоминаний"""
+    check_at = datetime.combine(now.date(), _REMINDER_TIME_OBJ, tzinfo=MOSCOW_TZ) - REMINDER_REFRESH_LEAD
+    if check_at <= now:
+        check_at += timedelta(days=1)
+    return max(1, (check_at - now).total_seconds())
+
+async def periodic_tick(context: ContextTypes.DEFAULT_TYPE):
+    """Единый периодический джоб: проверка напоминаний и очистка кэша
+    
+    Джоб сам планирует следующий запуск прямо перед рассылкой, вместо опроса по интервалу.
+    """
+    try:
+        await check_reminders_now(context)
+        prune_sheet_cache()
+    finally:
+        context.job_queue.run_once(
+            periodic_tick,
+            when=_next_tick_delay(datetime.now(MOSCOW_TZ)),
+            name="periodic_tick"
+        )
 
 # ==================== СИСТЕМА ЯЗЫКА ====================
 async def callback_language_settings(update: Update, context: ContextTypes.DEFAULT_TYPE):
     query = update.callback_query
-    await query.answer()
-    user_data = get_user_data(query.from_user.id)
-    
-    keyboard = [
-        [InlineKeyboardButton("🇷🇺 Русский", callback_data="set_lang_ru")],
-        [InlineKeyboardButton("🇬🇧 English", callback_data="set_lang_en")],
-        [InlineKeyboardButton("↩️ Назад" if user_data["language"] == "ru" else "↩️ Back", callback_data="back_to_menu")]
-    ]
+    _, user_data = await asyncio.gather(query.answer(), aget_user_data(query.from_user.id))
+    lang = user_data["language"]
+    is_ru = lang == "ru"
     
     await query.edit_message_text(
-        "🌐 Выберите язык:" if user_data["language"] == "ru" else "🌐 Select language:",
-        reply_markup=InlineKeyboardMarkup(keyboard))
+        "🌐 Выберите язык:" if is_ru else "🌐 Select language:",
+        reply_markup=language_keyboard(lang))
 
 async def set_user_language(update: Update, context: ContextTypes.DEFAULT_TYPE):
     query = update.callback_query
     await query.answer()
     user_id = query.from_user.id
-    lang = query.data.replace("set_lang_", "")
+    lang = query.data.removeprefix("set_lang_")
     
     try:
-        if update_user_data(user_id, "language", lang):
-            user_data = get_user_data(user_id)
+        user_data = await aupdate_user_data(user_id, "language", lang)
+        if user_data is not None:
             await query.edit_message_text(
-                "✅ Язык изменен на русский!" if user_data["language"] == "ru" else "✅ Language changed to English!",
+                MESSAGES[user_data["language"]]["language_changed"],
                 reply_markup=main_menu_keyboard(user_data["language"], user_data["is_curator"]))
     except Exception as e:
-        logger.error(f"Ошибка при изменении языка: {e}")
-        user_data = get_user_data(user_id)
+        logger.error("Ошибка при изменении языка: %s", e)
+        user_data = await aget_user_data(user_id)
         await query.edit_message_text(
             "⛔ Произошла ошибка при изменении языка." if user_data["language"] == "ru" else "⛔ Error changing language.",
             reply_markup=main_menu_keyboard(user_data["language"], user_data["is_curator"]))
@@ -1668,149 +2510,228 @@ async def set_user_language(update: Update, context: ContextTypes.DEFAULT_TYPE):
 # ==================== СИСТЕМА ОБРАТНОЙ СВЯЗИ ====================
 async def callback_leave_feedback(update: Update, context: ContextTypes.DEFAULT_TYPE):
     query = update.callback_query
-    await query.answer()
-    user_data = get_user_data(query.from_user.id)
+    _, user_data = await asyncio.gather(query.answer(), aget_user_data(query.from_user.id))
+    lang = user_data["language"]
     
     await query.edit_message_text(
-        "📝 Пожалуйста, напишите ваш отзыв или предложение по улучшению бота:" if user_data["language"] == "ru" else 
-        "📝 Please write your feedback or suggestion for improving the bot:",
-        reply_markup=InlineKeyboardMarkup([[InlineKeyboardButton("↩️ Отменить" if user_data["language"] == "ru" else "↩️ Cancel", callback_data="cancel_feedback")]])
+        MESSAGES[lang]["feedback_prompt"],
+        reply_markup=feedback_cancel_keyboard(lang)
     )
     return WAITING_FOR_FEEDBACK
 
 async def handle_feedback_input(update: Update, context: ContextTypes.DEFAULT_TYPE):
     user_id = update.effective_user.id
     feedback_text = update.message.text
-    user_data = get_user_data(user_id)
+    user_data = await aget_user_data(user_id)
+    lang = user_data["language"]
     
     try:
-        if update_user_data(user_id, "feedback", feedback_text):
+        if await aupdate_user_data(user_id, "feedback", feedback_text) is not None:
             await update.message.reply_text(
-                "✅ Спасибо за ваш отзыв! Мы учтем ваши пожелания." if user_data["language"] == "ru" else 
-                "✅ Thank you for your feedback! We'll take it into account.",
-                reply_markup=main_menu_keyboard(user_data["language"], user_data["is_curator"]))
+                MESSAGES[lang]["feedback_saved"],
+                reply_markup=main_menu_keyboard(lang, user_data["is_curator"]))
         else:
             await update.message.reply_text(
-                "⛔ Не удалось сохранить отзыв. Попробуйте позже." if user_data["language"] == "ru" else 
-                "⛔ Failed to save feedback. Please try again later.",
-                reply_markup=main_menu_keyboard(user_data["language"], user_data["is_curator"]))
+                MESSAGES[lang]["feedback_failed"],
+                reply_markup=main_menu_keyboard(lang, user_data["is_curator"]))
     except Exception as e:
-        logger.error(f"Ошибка при сохранении фидбэка: {e}")
+        logger.error("Ошибка при сохранении фидбэка: %s", e)
         await update.message.reply_text(
-            "⛔ Произошла ошибка при сохранении отзыва." if user_data["language"] == "ru" else 
-            "⛔ An error occurred while saving feedback.",
-            reply_markup=main_menu_keyboard(user_data["language"], user_data["is_curator"]))
+            MESSAGES[lang]["feedback_error"],
+            reply_markup=main_menu_keyboard(lang, user_data["is_curator"]))
     
     return ConversationHandler.END
 
 async def cancel_feedback(update: Update, context: ContextTypes.DEFAULT_TYPE):
     query = update.callback_query
-    await query.answer()
-    user_data = get_user_data(query.from_user.id)
+    _, user_data = await asyncio.gather(query.answer(), aget_user_data(query.from_user.id))
+    lang = user_data["language"]
     
     await query.edit_message_text(
-        "🚫 Отправка отзыва отменена." if user_data["language"] == "ru" else "🚫 Feedback submission canceled.",
-        reply_markup=main_menu_keyboard(user_data["language"], user_data["is_curator"]))
+        MESSAGES[lang]["feedback_canceled"],
+        reply_markup=main_menu_keyboard(lang, user_data["is_curator"]))
     return ConversationHandler.END
 
 # ==================== ОСНОВНАЯ ФУНКЦИЯ ====================
+async def post_init(application: Application):
+    """Прогреть кэш листами, которые были в нем до перезапуска
+    
+    В bot_data хранятся только названия листов, а данные загружаются заново
+    одним batchGet: правки таблицы, сделанные пока бот был выключен, видны сразу.
+    """
+    # Снимок данных кэша, который сохраняли прежние версии, больше не нужен
+    application.bot_data.pop("sheet_cache", None)
+    warm_sheets = [name for name in application.bot_data.get("warm_sheets", ()) if name in gsh.sheets]
+    if warm_sheets:
+        try:
+            await awarm_sheet_cache(warm_sheets)
+        except Exception as e:
+            logger.error("Ошибка при прогреве кэша листов: %s", e)
+
+async def post_stop(application: Application):
+    """Запомнить названия листов в кэше, чтобы прогреть их после перезапуска"""
+    application.bot_data["warm_sheets"] = list(_sheet_cache)
+
 def main():
     token = os.getenv("TELEGRAM_BOT_TOKEN")
     if not token:
         logger.critical("TELEGRAM_BOT_TOKEN environment variable not set")
         return
     
-    # Настройка прокси для обхода блокировок
-    request_kwargs = {
-        'proxy_url': PROXY_URL,
-        'connect_timeout': 20,
-        'read_timeout': 20
-    }
-    
-    application = Application.builder().token(token).request_kwargs(request_kwargs).build()
-
-    # Основные обработчики
-    application.add_handler(CommandHandler("start", start))
-    application.add_handler(CallbackQueryHandler(callback_get_data, pattern="get_data"))
-    application.add_handler(CallbackQueryHandler(callback_help, pattern="help"))
-    application.add_handler(CallbackQueryHandler(callback_back_to_menu, pattern="back_to_menu"))
-    application.add_handler(CallbackQueryHandler(callback_select_group, pattern="select_group"))
-    application.add_handler(CallbackQueryHandler(set_user_group, pattern="^set_group_B-11$|^set_group_B-12$"))
-    application.add_handler(CallbackQueryHandler(callback_admin_panel, pattern="admin_panel"))
-
-    # Обработчики настроек
-    application.add_handler(CallbackQueryHandler(callback_reminder_settings, pattern="reminder_settings"))
-    application.add_handler(CallbackQueryHandler(toggle_reminders, pattern="toggle_reminders"))
-    application.add_handler(CallbackQueryHandler(callback_language_settings, pattern="language_settings"))
-    application.add_handler(CallbackQueryHandler(set_user_language, pattern="^set_lang_ru$|^set_lang_en$"))
-
-    # Обработчики админ-панели
-    application.add_handler(CallbackQueryHandler(admin_make_curator, pattern="admin_make_curator"))
-    application.add_handler(CallbackQueryHandler(admin_list_curators, pattern="admin_list_curators"))
-    application.add_handler(CallbackQueryHandler(admin_stats, pattern="admin_stats"))
-    application.add_handler(CallbackQueryHandler(admin_new_semester, pattern="admin_new_semester"))
-    application.add_handler(CallbackQueryHandler(confirm_new_semester, pattern="confirm_new_semester"))
+    # uvloop ускоряет event loop, но необязателен (например, на Windows)
+    try:
+        import uvloop
+        uvloop.install()
+    except ImportError:
+        logger.info("uvloop not installed, using default asyncio event loop")
+    
+    # Состояние диалогов и список листов для прогрева кэша сохраняются между перезапусками
+    persistence = PicklePersistence(filepath=PERSISTENCE_FILE, update_interval=60)
+    
+    # Обновления разных чатов обрабатываются параллельно, а исходящие запросы
+    # ограничиваются AIORateLimiter согласно лимитам Telegram; при 429 он ждет
+    # retry_after и повторяет запрос, а не теряет сообщение
+    application = (
+        Application.builder()
+        .token(token)
+        .persistence(persistence)
+        .post_init(post_init)
+        .post_stop(post_stop)
+        # Прокси для обхода блокировок и общий пул соединений к Bot API
+        .proxy_url(PROXY_URL)
+        .connect_timeout(20)
+        .read_timeout(20)
+        .connection_pool_size(TG_CONNECTION_POOL_SIZE)
+        .pool_timeout(TG_POOL_TIMEOUT)
+        .http_version(TG_HTTP_VERSION)
+        # Long polling идет отдельным клиентом — ему нужен тот же прокси
+        .get_updates_proxy_url(PROXY_URL)
+        .get_updates_http_version(TG_HTTP_VERSION)
+        .concurrent_updates(CONCURRENT_UPDATES)
+        .rate_limiter(AIORateLimiter(max_retries=TG_RATE_LIMIT_RETRIES))
+        .build()
+    )
+
+    # Общий fallback для всех диалогов
+    cancel_fallback = [CommandHandler("cancel", callback_back_to_menu)]
 
     # Обработчик для добавления заданий
     add_task_handler = ConversationHandler(
-        entry_points=[CallbackQueryHandler(callback_add_task, pattern="add_task")],
+        name="add_task",
+        persistent=True,
+        entry_points=[CallbackQueryHandler(callback_add_task, pattern=CALLBACK_PATTERNS["add_task"])],
         states={
-            EDITING_TASK: [CallbackQueryHandler(edit_task_parameter)],
-            WAITING_FOR_INPUT: [MessageHandler(filters.TEXT & ~filters.COMMAND, handle_user_input)],
+            # Нажатия маршрутизируются шаблонами callback_data, без разбора в одном обработчике
+            EDITING_TASK: [
+                CallbackQueryHandler(edit_task_show_picker, pattern=EDIT_TASK_PATTERNS["picker"]),
+                CallbackQueryHandler(edit_task_request_input, pattern=EDIT_TASK_PATTERNS["input"]),
+                CallbackQueryHandler(edit_task_parameter, pattern=EDIT_TASK_PATTERNS["value"]),
+                CallbackQueryHandler(edit_task_save, pattern=EDIT_TASK_PATTERNS["save"]),
+                CallbackQueryHandler(edit_task_cancel, pattern=EDIT_TASK_PATTERNS["cancel"]),
+            ],
+            WAITING_FOR_INPUT: [MessageHandler(TEXT_NO_COMMAND, handle_user_input)],
         },
-        fallbacks=[CommandHandler("cancel", callback_back_to_menu)],
+        fallbacks=cancel_fallback,
     )
 
     # Обработчик для удаления заданий
     delete_task_handler = ConversationHandler(
-        entry_points=[CallbackQueryHandler(callback_delete_task, pattern="delete_task")],
+        name="delete_task",
+        persistent=True,
+        entry_points=[CallbackQueryHandler(callback_delete_task, pattern=CALLBACK_PATTERNS["delete_task"])],
         states={
             EDITING_TASK: [CallbackQueryHandler(handle_task_deletion)]
         },
-        fallbacks=[CommandHandler("cancel", callback_back_to_menu)],
+        fallbacks=cancel_fallback,
     )
 
     # Обработчик для фидбэка
     feedback_handler = ConversationHandler(
-        entry_points=[CallbackQueryHandler(callback_leave_feedback, pattern="leave_feedback")],
+        name="feedback",
+        persistent=True,
+        entry_points=[CallbackQueryHandler(callback_leave_feedback, pattern=CALLBACK_PATTERNS["leave_feedback"])],
         states={
             WAITING_FOR_FEEDBACK: [
-                MessageHandler(filters.TEXT & ~filters.COMMAND, handle_feedback_input),
-                CallbackQueryHandler(cancel_feedback, pattern="cancel_feedback")
+                MessageHandler(TEXT_NO_COMMAND, handle_feedback_input, block=False),
+                CallbackQueryHandler(cancel_feedback, pattern=CALLBACK_PATTERNS["cancel_feedback"])
             ]
         },
-        fallbacks=[CommandHandler("cancel", callback_back_to_menu)],
+        fallbacks=cancel_fallback,
     )
 
     # Обработчик для назначения кураторов
     curator_handler = ConversationHandler(
-        entry_points=[CallbackQueryHandler(admin_make_curator, pattern="admin_make_curator")],
+        name="curator",
+        persistent=True,
+        entry_points=[CallbackQueryHandler(admin_make_curator, pattern=CALLBACK_PATTERNS["admin_make_curator"])],
         states={
-            WAITING_FOR_CURATOR_ID: [MessageHandler(filters.TEXT & ~filters.COMMAND, handle_curator_id)],
+            WAITING_FOR_CURATOR_ID: [MessageHandler(TEXT_NO_COMMAND, handle_curator_id, block=False)],
         },
-        fallbacks=[CommandHandler("cancel", callback_back_to_menu)],
+        fallbacks=cancel_fallback,
     )
 
     # Обработчик для ввода группы
-    group_handler = MessageHandler(filters.TEXT & ~filters.COMMAND, handle_group_input)
-
-    application.add_handler(add_task_handler)
-    application.add_handler(delete_task_handler)
-    application.add_handler(feedback_handler)
-    application.add_handler(curator_handler)
-    application.add_handler(group_handler)
+    group_handler = MessageHandler(TEXT_NO_COMMAND, handle_group_input, block=False)
+
+    # Все обработчики регистрируются одним вызовом; порядок важен — срабатывает первый подходящий
+    application.add_handlers([
+        # Основные обработчики
+        CommandHandler("start", start),
+        CallbackQueryHandler(callback_get_data, pattern=CALLBACK_PATTERNS["get_data"]),
+        CallbackQueryHandler(callback_help, pattern=CALLBACK_PATTERNS["help"]),
+        CallbackQueryHandler(callback_back_to_menu, pattern=CALLBACK_PATTERNS["back_to_menu"]),
+        CallbackQueryHandler(callback_select_group, pattern=CALLBACK_PATTERNS["select_group"]),
+        CallbackQueryHandler(set_user_group, pattern=CALLBACK_PATTERNS["set_group"]),
+        CallbackQueryHandler(callback_admin_panel, pattern=CALLBACK_PATTERNS["admin_panel"]),
+
+        # Обработчики настроек
+        CallbackQueryHandler(callback_reminder_settings, pattern=CALLBACK_PATTERNS["reminder_settings"]),
+        CallbackQueryHandler(toggle_reminders, pattern=CALLBACK_PATTERNS["toggle_reminders"]),
+        CallbackQueryHandler(callback_language_settings, pattern=CALLBACK_PATTERNS["language_settings"]),
+        CallbackQueryHandler(set_user_language, pattern=CALLBACK_PATTERNS["set_lang"]),
+
+        # Обработчики админ-панели (назначение куратора — через curator_handler)
+        CallbackQueryHandler(admin_list_curators, pattern=CALLBACK_PATTERNS["admin_list_curators"]),
+        CallbackQueryHandler(admin_stats, pattern=CALLBACK_PATTERNS["admin_stats"]),
+        CallbackQueryHandler(admin_new_semester, pattern=CALLBACK_PATTERNS["admin_new_semester"]),
+        CallbackQueryHandler(confirm_new_semester, pattern=CALLBACK_PATTERNS["confirm_new_semester"]),
+
+        # Диалоги
+        add_task_handler,
+        delete_task_handler,
+        feedback_handler,
+        curator_handler,
+        group_handler,
+    ])
     
-    # Настраиваем периодическую проверку напоминаний
+    # Настраиваем периодическую проверку напоминаний (один таймер на все задачи)
     job_queue = application.job_queue
-    if job_queue:
-        job_queue.run_repeating(
-            check_reminders_now,
-            interval=timedelta(minutes=REMINDER_CHECK_INTERVAL),
-            first=10
+    if job_queue is None:
+        raise RuntimeError("JobQueue is unavailable: install python-telegram-bot[job-queue]")
+    job_queue.run_once(periodic_tick, when=10, name="periodic_tick")
+    
+    # Если задан публичный URL — получаем обновления через вебхук,
+    # иначе используем long polling с максимальным окном ожидания.
+    # Накопившиеся за время простоя обновления при старте отбрасываются.
+    public_url = os.getenv("PUBLIC_URL")
+    if public_url:
+        logger.info("Bot started successfully with webhook!")
+        application.run_webhook(
+            listen="0.0.0.0",
+            port=int(os.getenv("PORT", "8443")),
+            url_path=token,
+            webhook_url=f"{public_url.rstrip('/')}/{token}",
+            allowed_updates=ALLOWED_UPDATES,
+            drop_pending_updates=True
+        )
+    else:
+        logger.info("Bot started successfully with proxy!")
+        application.run_polling(
+            poll_interval=0,
+            timeout=30,
+            allowed_updates=ALLOWED_UPDATES,
+            drop_pending_updates=True
         )
-    
-    logger.info("Bot started successfully with proxy!")
-    application.run_polling(allowed_updates=Update.ALL_TYPES)
 
 if __name__ == '__main__':
     main()
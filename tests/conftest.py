@@ -0,0 +1,39 @@
+"""Общие фикстуры тестов: модуль App импортируется без обращения к Google Sheets"""
+import importlib
+import sys
+from pathlib import Path
+
+import gspread
+import pytest
+import requests
+from oauth2client.service_account import ServiceAccountCredentials
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+
+class _OfflineSpreadsheet:
+    """Пустая таблица без листов"""
+
+    def worksheets(self):
+        return []
+
+
+class _OfflineClient:
+    """Клиент gspread, который никуда не ходит по сети"""
+
+    def __init__(self):
+        self.session = requests.Session()
+
+    def open(self, name):
+        return _OfflineSpreadsheet()
+
+
+@pytest.fixture(scope="session")
+def app():
+    """Модуль App с офлайн-клиентом Google Sheets"""
+    with pytest.MonkeyPatch.context() as mp:
+        mp.setenv("GOOGLE_CREDENTIALS", "{}")
+        mp.setattr(ServiceAccountCredentials, "from_json_keyfile_dict",
+                   classmethod(lambda cls, keyfile_dict, scope: None))
+        mp.setattr(gspread, "authorize", lambda creds: _OfflineClient())
+        return importlib.import_module("App")
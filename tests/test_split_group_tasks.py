@@ -0,0 +1,51 @@
+"""Тесты разделения заданий группы на актуальные и прошедшие"""
+from datetime import datetime
+
+HEADER = ["Subject", "Task Type", "Format", "Max Points", "Date", "Time", "Group", "Book Type", "Details"]
+
+
+def _row(subject, date, time="10:00", group="B-23"):
+    return [subject, "HW", "Online", "5", date, time, group, "open-book", ""]
+
+
+def test_january_task_is_not_expired_in_late_december(app):
+    now = datetime(2026, 12, 28, 12, 0, tzinfo=app.MOSCOW_TZ)
+    values = [HEADER, _row("Law", "05.01"), _row("Math", "30.12")]
+
+    tasks, expired_rows = app.split_group_tasks(values, "B-23", now)
+
+    # 05.01 относится к следующему году: задание не удаляется
+    assert expired_rows == []
+    assert [row_idx for _, _, row_idx in tasks] == [3]
+    assert app.convert_to_datetime("10:00", "05.01", now) > now
+
+
+def test_task_with_passed_deadline_is_expired(app):
+    now = datetime(2026, 10, 16, 12, 0, tzinfo=app.MOSCOW_TZ)
+    values = [
+        HEADER,
+        _row("Law", "16.10", "10:00"),   # сегодня, время уже прошло
+        _row("Math", "16.10", "18:00"),  # сегодня, еще впереди
+        _row("Stats", "15.10"),          # вчера: до переноса на следующий год больше окна напоминаний
+        _row("Other", "16.10", group="B-24"),
+    ]
+
+    tasks, expired_rows = app.split_group_tasks(values, "B-23", now)
+
+    assert expired_rows == [2, 4]
+    assert [row_idx for _, _, row_idx in tasks] == [3]
+
+
+def test_january_task_inside_reminder_window_is_kept_but_old_rows_are_expired(app):
+    now = datetime(2026, 12, 28, 12, 0, tzinfo=app.MOSCOW_TZ)
+    values = [
+        HEADER,
+        _row("Law", "05.01"),    # через 8 дней в следующем году — в окне напоминаний
+        _row("Math", "20.12"),   # на прошлой неделе
+        _row("Stats", "15.03"),  # весной этого года
+    ]
+
+    tasks, expired_rows = app.split_group_tasks(values, "B-23", now)
+
+    assert tasks == []
+    assert expired_rows == [3, 4]